@@ -0,0 +1,34 @@
+# Replace-on-write used for every file the app keeps: config, caches,
+# indexes and saved cards. Data goes to a temp file next to the target,
+# named after the process and thread so two writers (threads, batch
+# workers or a second instance) never share one, and is renamed over the
+# target only once complete. A crash or a full disk leaves the previous
+# file in place, never a truncated one.
+
+import os
+import threading
+from contextlib import contextmanager
+
+
+def temp_path(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+@contextmanager
+def atomic_write(path, mode="w", encoding=None):
+    # with atomic_write(path) as f: json.dump(data, f)
+    # Text mode defaults to UTF-8. Errors propagate like open() / os.replace()
+    # after the temp file is removed; the parent directory must exist.
+    if "b" not in mode and encoding is None:
+        encoding = "utf-8"
+
+    tmp = temp_path(path)
+    try:
+        with open(tmp, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,158 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+
+import profiling
+from png_writer import PNG_PRESETS, DEFAULT_PNG_PRESET, save_png
+from renderer import TEMPLATES, render_card, card_filename, logo_name_from_path, open_image
+from web_store import load_image_from_url
+
+# Batch mode: render every row of a CSV / JSON manifest without the GUI.
+#
+#   python batch.py manifest.csv -o out/
+#
+# Manifest columns / keys:
+#   title        card title, used for the output filename
+#   poster       poster file path or http(s) URL
+#   logo         system logo file path (optional)
+#   template     template name, see TEMPLATES (defaults to --template)
+#   crop_mode    center | top | bottom | manual (optional)
+#   crop_offset  manual crop offset, 0–1000 (optional)
+
+DEFAULT_TEMPLATE = "Black with Pins"
+MANIFEST_FIELDS = ("title", "poster", "logo", "template", "crop_mode", "crop_offset")
+
+
+# ---------------- MANIFEST ----------------
+
+def read_manifest(path):
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    return [
+        {k: (row.get(k) or None) for k in MANIFEST_FIELDS}
+        for row in rows
+    ]
+
+def plan_outputs(rows, output_dir):
+    # One timestamp per run; duplicate names inside a run get a counter
+    ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    used = set()
+    jobs = []
+
+    for row in rows:
+        filename = card_filename(row["title"], logo_name_from_path(row["logo"]), ts)
+        stem, ext = os.path.splitext(filename)
+
+        n = 2
+        while filename in used:
+            filename = f"{stem}_{n}{ext}"
+            n += 1
+        used.add(filename)
+
+        jobs.append((row, os.path.join(output_dir, filename)))
+
+    return jobs
+
+
+# ---------------- WORKER ----------------
+
+def load_poster(src):
+    if src.lower().startswith(("http://", "https://")):
+        return load_image_from_url(src)
+
+    return open_image(src)
+
+def render_row(row, out_path, default_template, png_preset=DEFAULT_PNG_PRESET):
+    # With --profile every row gets its own .pstats file
+    with profiling.profile(f"batch_{os.path.basename(out_path)}"):
+        poster = load_poster(row["poster"]) if row["poster"] else None
+        logo = open_image(row["logo"]) if row["logo"] else None
+
+        img = render_card(
+            row["template"] or default_template,
+            poster=poster,
+            logo=logo,
+            crop_mode=row["crop_mode"] or "center",
+            crop_offset=int(row["crop_offset"] or 0)
+        )
+        if img is None:
+            raise ValueError("template needs a poster")
+
+        save_png(img, out_path, png_preset)
+    return out_path
+
+
+# ---------------- RUN ----------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render NFC cards from a CSV or JSON manifest."
+    )
+    parser.add_argument("manifest", help="CSV or JSON manifest file")
+    parser.add_argument("-o", "--output", required=True, help="output folder")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1,
+        help="worker processes (default: all CPU cores)"
+    )
+    parser.add_argument(
+        "-t", "--template", default=DEFAULT_TEMPLATE, choices=list(TEMPLATES),
+        help="template for rows that do not name one"
+    )
+    parser.add_argument(
+        "-c", "--compression", default=DEFAULT_PNG_PRESET, choices=list(PNG_PRESETS),
+        help="PNG compression preset, fast / large to slow / small "
+             f"(default: {DEFAULT_PNG_PRESET})"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help=f"write a cProfile report per card to {profiling.PROFILE_DIR}/"
+    )
+    args = parser.parse_args(argv)
+
+    rows = read_manifest(args.manifest)
+    for row in rows:
+        if row["template"] and row["template"] not in TEMPLATES:
+            parser.error(f"unknown template: {row['template']}")
+
+    os.makedirs(args.output, exist_ok=True)
+    jobs = plan_outputs(rows, args.output)
+
+    start = time.perf_counter()
+    failed = 0
+
+    with ProcessPoolExecutor(
+            max_workers=max(1, args.jobs),
+            initializer=profiling.enable if args.profile else None
+    ) as pool:
+        futures = {
+            pool.submit(render_row, row, out_path, args.template, args.compression): row
+            for row, out_path in jobs
+        }
+
+        for done, future in enumerate(as_completed(futures), 1):
+            row = futures[future]
+            try:
+                path = future.result()
+                print(f"[{done}/{len(jobs)}] {path}")
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(jobs)}] FAILED {row['title']}: {e}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {len(jobs) - failed}/{len(jobs)} cards in {elapsed:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+import argparse
+import json
+import os
+import platform
+import random
+import multiprocessing
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from io import BytesIO
+
+import PIL
+from PIL import Image, ImageDraw
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import perf
+from renderer import TEMPLATES, render_card, clear_cover_cache
+
+# Render benchmark: synthetic posters and logos through every template and
+# crop mode, headless and without network access.
+#
+#   python benchmark.py -o bench.json
+#   python benchmark.py -o new.json --compare old.json
+#
+# Every case is timed cold (empty cover cache, as after picking a poster),
+# warm (cache hit, as on a crop slider tick), at preview scale, and for PNG
+# encoding. Stage timings come from the perf.stage() hooks in the renderer.
+# Each case runs in a fresh worker process so its peak RSS is its own;
+# Pillow keeps pixel data outside the Python heap that tracemalloc sees.
+
+# name -> (size, encoded format); landscape posters use the horizontal
+# crop path, so "manual" exercises cover_image_manual_x
+POSTERS = {
+    "portrait": ((1000, 1500), "JPEG"),
+    "landscape": ((1920, 1080), "JPEG"),
+    "tiny": ((120, 180), "PNG"),
+    "4k": ((3840, 2160), "JPEG"),
+}
+
+LOGOS = {
+    "wide": (600, 150),
+    "square": (256, 256),
+    "tall": (150, 400),
+}
+
+# (crop mode, offset); manual offsets cover both ends and the clamp path
+CROPS = [
+    ("center", 0),
+    ("top", 0),
+    ("bottom", 0),
+    ("manual", 0),
+    ("manual", 500),
+    ("manual", 1000),
+]
+
+PREVIEW_SCALE = 0.5
+DEFAULT_REPEAT = 3
+REGRESSION_THRESHOLD = 1.10
+
+
+# ---------------- SYNTHETIC IMAGES ----------------
+
+def make_poster(size, seed):
+    # Gradients plus random shapes: deterministic, and not trivially
+    # compressible like a flat fill
+    rng = random.Random(seed)
+    w, h = size
+
+    img = Image.merge("RGB", (
+        Image.linear_gradient("L").resize(size),
+        Image.radial_gradient("L").resize(size),
+        Image.linear_gradient("L").rotate(90).resize(size),
+    ))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randrange(w), rng.randrange(h)
+        r = rng.randrange(max(2, min(w, h) // 4))
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=color)
+    return img
+
+def make_logo(size, seed):
+    rng = random.Random(seed)
+    w, h = size
+
+    img = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle((0, h // 4, w - 1, h * 3 // 4), radius=h // 8, fill=(230, 30, 40, 255))
+    for _ in range(6):
+        x, y = rng.randrange(w), rng.randrange(h)
+        draw.text((x, y), "NFC", fill=(255, 255, 255, 255))
+    return img
+
+def encode(img, fmt):
+    buf = BytesIO()
+    img.save(buf, format=fmt, quality=90)
+    return buf.getvalue()
+
+
+# ---------------- MEASUREMENT ----------------
+
+def max_rss_mb():
+    # VmHWM is the process' own peak; ru_maxrss survives exec on Linux and
+    # would report the parent's peak in a freshly spawned worker
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def summarize(samples):
+    ms = [s * 1000 for s in samples]
+    return {
+        "median_ms": round(statistics.median(ms), 3),
+        "min_ms": round(min(ms), 3),
+        "max_ms": round(max(ms), 3),
+        "n": len(ms),
+    }
+
+
+# ---------------- CASES ----------------
+
+def plan_cases(posters, templates):
+    cases = []
+    for poster in posters:
+        for template in templates:
+            for crop_mode, offset in CROPS:
+                cases.append((poster, template, crop_mode, offset, "wide"))
+
+    # Logo shapes only change the logo stages; one poster / crop is enough.
+    # Templates without a logo would only repeat the same case.
+    for template in templates:
+        if TEMPLATES[template].get("mode") == "full-poster-rounded":
+            continue
+        for logo in LOGOS:
+            if logo != "wide":
+                cases.append((posters[0], template, "center", 0, logo))
+        cases.append((posters[0], template, "center", 0, None))
+
+    return cases
+
+def run_case(case, sources, logos, repeat):
+    poster_name, template, crop_mode, offset, logo_name = case
+    data = sources[poster_name]
+    logo = logos.get(logo_name)
+
+    stages = {}
+
+    def collect(name, seconds):
+        stages.setdefault(name, []).append(seconds)
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        stages.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+
+    def render(poster, scale=1.0):
+        return render_card(
+            template, poster=poster, logo=logo, crop_mode=crop_mode,
+            crop_offset=offset, scale=scale
+        )
+
+    base_rss = max_rss_mb()
+    perf.add_collector(collect)
+    try:
+        for _ in range(repeat):
+            poster = timed("decode", lambda: Image.open(BytesIO(data)).convert("RGBA"))
+
+            clear_cover_cache()
+            out = timed("render_cold", lambda: render(poster))
+            timed("render_warm", lambda: render(poster))
+            timed("preview", lambda: render(poster, PREVIEW_SCALE))
+            if out is not None:
+                timed("png_encode", lambda: out.save(BytesIO(), format="PNG"))
+    finally:
+        perf.remove_collector(collect)
+
+    peak_rss = max_rss_mb()
+
+    # tracemalloc hooks every allocation and would skew the timings, so
+    # the Python heap peak comes from one separate, untimed pass
+    clear_cover_cache()
+    tracemalloc.start()
+    try:
+        poster = Image.open(BytesIO(data)).convert("RGBA")
+        out = render(poster)
+        render(poster, PREVIEW_SCALE)
+        if out is not None:
+            out.save(BytesIO(), format="PNG")
+        _, py_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "poster": poster_name,
+        "template": template,
+        "mode": TEMPLATES[template].get("mode", "framed"),
+        "crop_mode": crop_mode,
+        "crop_offset": offset,
+        "logo": logo_name,
+        "stages": {name: summarize(s) for name, s in sorted(stages.items())},
+        "peak_rss_mb": peak_rss,
+        "peak_rss_delta_mb": None if peak_rss is None else round(peak_rss - base_rss, 1),
+        "peak_python_heap_kb": round(py_peak / 1024, 1),
+    }
+
+def case_key(result):
+    return (result["poster"], result["template"], result["crop_mode"],
+            result["crop_offset"], result["logo"])
+
+def summarize_by_mode(results):
+    # Median of the per-case medians, per template mode and stage
+    modes = {}
+    for r in results:
+        for name, s in r["stages"].items():
+            modes.setdefault(r["mode"], {}).setdefault(name, []).append(s["median_ms"])
+    return {
+        mode: {name: round(statistics.median(v), 3) for name, v in sorted(stages.items())}
+        for mode, stages in sorted(modes.items())
+    }
+
+
+# ---------------- COMPARE ----------------
+
+def compare(results, baseline_path, stage_name="render_cold"):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {case_key(r): r for r in json.load(f)["cases"]}
+
+    regressions = 0
+    for r in results:
+        old = baseline.get(case_key(r))
+        if not old or stage_name not in old["stages"] or stage_name not in r["stages"]:
+            continue
+
+        before = old["stages"][stage_name]["median_ms"]
+        after = r["stages"][stage_name]["median_ms"]
+        if before > 0 and after / before > REGRESSION_THRESHOLD:
+            regressions += 1
+            print(
+                f"SLOWER {stage_name} x{after / before:.2f} "
+                f"({before:.1f} -> {after:.1f} ms): {' / '.join(map(str, case_key(r)))}"
+            )
+
+    print(f"{regressions} regression(s) above x{REGRESSION_THRESHOLD:.2f} vs {baseline_path}")
+    return regressions
+
+
+# ---------------- RUN ----------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the card renderer with synthetic images."
+    )
+    parser.add_argument("-o", "--output", required=True, help="JSON results file")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=DEFAULT_REPEAT,
+        help=f"runs per case (default: {DEFAULT_REPEAT})"
+    )
+    parser.add_argument(
+        "-p", "--poster", action="append", choices=list(POSTERS),
+        help="only these synthetic posters (repeatable)"
+    )
+    parser.add_argument(
+        "-t", "--template", action="append", choices=list(TEMPLATES),
+        help="only these templates (repeatable)"
+    )
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    posters = args.poster or list(POSTERS)
+    templates = args.template or list(TEMPLATES)
+
+    sources = {
+        name: encode(make_poster(size, seed), fmt)
+        for seed, (name, (size, fmt)) in enumerate(POSTERS.items())
+        if name in posters
+    }
+    logos = {
+        name: make_logo(size, seed)
+        for seed, (name, size) in enumerate(LOGOS.items())
+    }
+
+    cases = plan_cases(posters, templates)
+    results = []
+    start = time.perf_counter()
+
+    # One case at a time, each in a fresh process: timings do not compete
+    # for cores and peak memory is per case
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1, maxtasksperchild=1) as pool:
+        for i, case in enumerate(cases, 1):
+            result = pool.apply(run_case, (case, sources, logos, max(1, args.repeat)))
+            results.append(result)
+            cold = result["stages"]["render_cold"]["median_ms"]
+            print(
+                f"[{i}/{len(cases)}] {' / '.join(map(str, case))}: "
+                f"{cold:.1f} ms, +{result['peak_rss_delta_mb']} MB"
+            )
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "preview_scale": PREVIEW_SCALE,
+            "elapsed_s": round(time.perf_counter() - start, 2),
+        },
+        "summary": summarize_by_mode(results),
+        "cases": results,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for mode, stages in report["summary"].items():
+        print(f"{mode}: " + ", ".join(f"{k} {v:.1f} ms" for k, v in stages.items()))
+    print(f"Wrote {len(results)} cases to {args.output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
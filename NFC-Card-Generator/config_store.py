@@ -0,0 +1,113 @@
+# In-process view of config.json. The file is read once; reads are served
+# from memory and writes are coalesced onto a short timer, then written
+# with replace-on-write so a crash or a second instance saving at the same
+# moment can never leave a half-written file behind.
+#
+# Only keys changed by this process are written back; they are merged over
+# whatever is on disk at that moment, so two running instances do not
+# silently revert each other's settings.
+
+import atexit
+import json
+import threading
+from collections import defaultdict
+
+from atomic_file import atomic_write
+
+CONFIG_FILE = "config.json"
+WRITE_DELAY = 0.5  # seconds; settings changed within this window share a write
+
+_DELETED = object()
+
+_data = None
+_dirty = {}
+_listeners = defaultdict(list)
+_lock = threading.RLock()
+_timer = None
+
+
+def _read_file():
+    try:
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print("Failed to read config, using defaults:", e)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def _load():
+    global _data
+    if _data is None:
+        _data = _read_file()
+    return _data
+
+
+# ---------------- ACCESS ----------------
+
+def get(key, default=None):
+    with _lock:
+        return _load().get(key, default)
+
+def put(key, value):
+    # value None removes the key
+    with _lock:
+        data = _load()
+        if data.get(key, _DELETED) == (_DELETED if value is None else value):
+            return
+
+        if value is None:
+            data.pop(key, None)
+            _dirty[key] = _DELETED
+        else:
+            data[key] = value
+            _dirty[key] = value
+        _schedule_write()
+        callbacks = list(_listeners[key])
+
+    for callback in callbacks:
+        callback(value)
+
+def subscribe(key, callback):
+    # callback(new_value) runs on the thread that called put()
+    with _lock:
+        _listeners[key].append(callback)
+
+
+# ---------------- WRITING ----------------
+
+def _schedule_write():
+    global _timer
+    if _timer is None:
+        _timer = threading.Timer(WRITE_DELAY, flush)
+        _timer.daemon = True
+        _timer.start()
+
+def flush():
+    global _timer
+
+    with _lock:
+        _timer = None
+        if not _dirty:
+            return
+
+        data = _read_file()
+        for key, value in _dirty.items():
+            if value is _DELETED:
+                data.pop(key, None)
+            else:
+                data[key] = value
+
+        try:
+            with atomic_write(CONFIG_FILE) as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print("Failed to save config:", e)
+            return
+
+        _dirty.clear()
+        _data.update(data)
+
+
+atexit.register(flush)
@@ -0,0 +1,232 @@
+# Network helpers shared by the GUI and batch scripts. Nothing in here may
+# touch Tk; results are handed back through callbacks.
+#
+# requests / urllib3 are imported on first use, not at import time, so
+# starting the GUI for local files does not pay for the network stack.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from atomic_file import atomic_write
+from perf import stage
+
+# Parallel downloads allowed per host. Image CDNs handle more than the
+# API hosts; anything not listed uses DEFAULT_HOST_CONCURRENCY.
+DEFAULT_HOST_CONCURRENCY = 4
+HOST_CONCURRENCY = {
+    "image.tmdb.org": 8,
+    "cdn2.steamgriddb.com": 6,
+}
+MAX_DOWNLOAD_WORKERS = 16
+
+DEFAULT_TIMEOUT = 10
+
+# Transient failures are retried with exponential backoff
+# (0.5s, 1s, 2s); 429 responses honour Retry-After.
+RETRY_POLICY = dict(
+    total=3,
+    connect=3,
+    read=2,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET", "HEAD"),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+# ---------------- SESSION ----------------
+
+def host_of(url):
+    return urlsplit(url).hostname or ""
+
+def get_session():
+    # One keep-alive connection pool per process, shared by every thread.
+    # Known hosts get a pool as large as their download concurrency so
+    # parallel thumbnail fetches reuse warm TLS connections.
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(**RETRY_POLICY)
+            session = requests.Session()
+            session.headers["User-Agent"] = "NFC-Card-Generator"
+
+            default = HTTPAdapter(
+                pool_connections=8,
+                pool_maxsize=DEFAULT_HOST_CONCURRENCY,
+                max_retries=retry
+            )
+            session.mount("https://", default)
+            session.mount("http://", default)
+
+            for host, size in HOST_CONCURRENCY.items():
+                session.mount(
+                    f"https://{host}/",
+                    HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=retry)
+                )
+
+            _session = session
+        return _session
+
+def http_get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    with stage("fetch"):
+        r = get_session().get(url, timeout=timeout, **kwargs)
+    r.raise_for_status()
+    return r
+
+
+# ---------------- CONCURRENT DOWNLOADS ----------------
+
+def fetch_many(urls, on_result, cancelled=lambda: False, per_host=None, timeout=DEFAULT_TIMEOUT):
+    # Download every url concurrently and call on_result(index, content)
+    # from the worker thread as soon as each one completes. Failed downloads
+    # are skipped. Once cancelled() returns True no new downloads start.
+    # Blocks until all downloads have finished or were skipped.
+    limits = dict(HOST_CONCURRENCY)
+    if isinstance(per_host, int):
+        limits = {host: per_host for host in limits}
+        default_limit = per_host
+    else:
+        limits.update(per_host or {})
+        default_limit = limits.pop("default", DEFAULT_HOST_CONCURRENCY)
+
+    hosts = {host_of(u) for u in urls}
+    gates = {h: threading.BoundedSemaphore(limits.get(h, default_limit)) for h in hosts}
+    workers = min(
+        MAX_DOWNLOAD_WORKERS,
+        sum(limits.get(h, default_limit) for h in hosts) or 1
+    )
+
+    def fetch(index, url):
+        with gates[host_of(url)]:
+            if cancelled():
+                return
+            r = http_get(url, timeout=timeout)
+        on_result(index, r.content)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fetch, i, u) for i, u in enumerate(urls)]
+
+        for future in as_completed(futures):
+            if cancelled():
+                pool.shutdown(wait=False, cancel_futures=True)
+                break
+            try:
+                future.result()
+            except Exception:
+                pass
+
+
+# ---------------- API RESPONSE CACHE ----------------
+
+# JSON responses from SteamGridDB / TMDB are kept on disk. Fresh entries
+# are served without touching the network; stale ones are revalidated
+# with ETag / Last-Modified. When the network is unreachable, or offline
+# mode is on, the last cached copy is served regardless of age.
+
+API_CACHE_DIR = "api-cache"
+
+API_CACHE_TTL = {
+    "steam_search": 24 * 3600,
+    "steam_grids": 6 * 3600,
+    "tmdb_search": 24 * 3600,
+    "tmdb_images": 24 * 3600,
+}
+DEFAULT_API_CACHE_TTL = 3600
+
+# Query parameters that must never end up in cache keys or files
+PRIVATE_PARAMS = ("api_key",)
+
+_offline = False
+
+
+class OfflineError(Exception):
+    pass
+
+
+def set_offline(value):
+    global _offline
+    _offline = bool(value)
+
+def is_offline():
+    return _offline
+
+def _api_cache_path(url, params):
+    public = sorted(
+        (k, str(v)) for k, v in (params or {}).items()
+        if k not in PRIVATE_PARAMS
+    )
+    key = hashlib.sha1(json.dumps([url, public]).encode("utf-8")).hexdigest()
+    return os.path.join(API_CACHE_DIR, key + ".json")
+
+def _read_api_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_api_cache(path, entry):
+    try:
+        os.makedirs(API_CACHE_DIR, exist_ok=True)
+        with atomic_write(path) as f:
+            json.dump(entry, f)
+    except OSError as e:
+        print("Failed to write API cache:", e)
+
+def cached_get_json(url, endpoint, params=None, headers=None, timeout=DEFAULT_TIMEOUT):
+    path = _api_cache_path(url, params)
+    entry = _read_api_cache(path)
+    ttl = API_CACHE_TTL.get(endpoint, DEFAULT_API_CACHE_TTL)
+
+    if entry and (_offline or time.time() - entry["fetched_at"] < ttl):
+        return entry["data"]
+    if _offline:
+        raise OfflineError(f"Offline and no cached response for {url}")
+
+    import requests
+
+    request_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        with stage("fetch"):
+            r = get_session().get(url, params=params, headers=request_headers, timeout=timeout)
+    except (requests.ConnectionError, requests.Timeout):
+        if entry:
+            return entry["data"]
+        raise
+
+    if r.status_code == 304 and entry:
+        entry["fetched_at"] = time.time()
+        _write_api_cache(path, entry)
+        return entry["data"]
+
+    r.raise_for_status()
+    data = r.json()
+
+    _write_api_cache(path, {
+        "url": url,
+        "fetched_at": time.time(),
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "data": data,
+    })
+    return data
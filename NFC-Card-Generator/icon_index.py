@@ -0,0 +1,319 @@
+# Persistent filename index for system logo folders (icon packs and cached
+# web logos). The first search of a folder scans it once; afterwards
+# queries are answered from memory while a background refresh re-lists
+# only directories whose mtime changed. Index state is saved to
+# ICON_INDEX_FILE so restarts do not rescan the whole pack.
+#
+# Names are ranked against the query: exact and prefix matches first, then
+# token, substring and acronym matches, then trigram similarity, so "snes"
+# finds "Super Nintendo" through an alias and "nintndo" still matches. A
+# plain substring of the file name always matches, as it did before ranking.
+
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+from atomic_file import atomic_write
+
+ICON_INDEX_FILE = "icon-index.json"
+ICON_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+REFRESH_INTERVAL = 30  # seconds between background refreshes of a root
+MIN_TRIGRAM_SIMILARITY = 0.4
+# Alias matches rank below a direct prefix match (85) of what was typed
+ALIAS_WEIGHT = 0.8
+
+# Common platform abbreviations -> names used by logo packs
+DEFAULT_ALIASES = {
+    "snes": ["super nintendo", "super famicom", "super nes", "sfc"],
+    "sfc": ["super famicom", "super nintendo"],
+    "nes": ["nintendo entertainment system", "famicom"],
+    "fc": ["famicom"],
+    "n64": ["nintendo 64"],
+    "gb": ["game boy", "gameboy"],
+    "gbc": ["game boy color", "gameboy color"],
+    "gba": ["game boy advance", "gameboy advance"],
+    "nds": ["nintendo ds"],
+    "gc": ["gamecube"],
+    "ngc": ["gamecube", "neo geo pocket color"],
+    "md": ["mega drive", "megadrive", "genesis"],
+    "genesis": ["mega drive", "megadrive"],
+    "megadrive": ["genesis"],
+    "sms": ["master system"],
+    "gg": ["game gear"],
+    "dc": ["dreamcast"],
+    "ps1": ["playstation"],
+    "psx": ["playstation"],
+    "ps2": ["playstation 2"],
+    "ps3": ["playstation 3"],
+    "psp": ["playstation portable"],
+    "pce": ["pc engine", "turbografx"],
+    "tg16": ["turbografx 16", "pc engine"],
+    "ngp": ["neo geo pocket"],
+    "ws": ["wonderswan"],
+    "2600": ["atari 2600"],
+}
+
+_aliases = dict(DEFAULT_ALIASES)
+
+_roots = None
+_lock = threading.RLock()
+_refreshing = set()
+
+
+# ---------------- PERSISTENCE ----------------
+
+def _load_roots():
+    global _roots
+    if _roots is None:
+        try:
+            with open(ICON_INDEX_FILE, "r", encoding="utf-8") as f:
+                _roots = json.load(f)
+        except (OSError, ValueError):
+            _roots = {}
+        for entry in _roots.values():
+            entry["checked_at"] = 0
+            _rebuild_names(entry)
+    return _roots
+
+def _save_roots():
+    data = {
+        root: {"dirs": entry["dirs"]}
+        for root, entry in _roots.items()
+    }
+    try:
+        with atomic_write(ICON_INDEX_FILE) as f:
+            json.dump(data, f)
+    except OSError as e:
+        print("Failed to save icon index:", e)
+
+
+# ---------------- SCANNING ----------------
+
+def _scan_dir(root, rel, dirs):
+    # List one directory and recurse into subdirectories it contains
+    path = os.path.join(root, rel) if rel else root
+    try:
+        mtime = os.stat(path).st_mtime
+        entries = list(os.scandir(path))
+    except OSError:
+        return
+
+    files = []
+    subdirs = []
+    for e in entries:
+        try:
+            if e.is_dir():
+                subdirs.append(e.name)
+            elif e.name.lower().endswith(ICON_EXTS):
+                files.append(e.name)
+        except OSError:
+            pass
+
+    dirs[rel] = {"mtime": mtime, "files": sorted(files), "subdirs": sorted(subdirs)}
+
+    for name in subdirs:
+        child = os.path.join(rel, name) if rel else name
+        if child not in dirs:
+            _scan_dir(root, child, dirs)
+
+def _refresh_dirs(root, dirs):
+    # Re-list only directories whose mtime changed; drop vanished ones.
+    # Adding, removing or renaming a file or subdirectory bumps the mtime
+    # of its parent directory.
+    dirs = dict(dirs)
+    changed = False
+
+    for rel in list(dirs):
+        if rel not in dirs:
+            continue  # removed together with its parent
+
+        path = os.path.join(root, rel) if rel else root
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            prefix = rel + os.sep
+            for other in [d for d in dirs if d == rel or d.startswith(prefix)]:
+                del dirs[other]
+            changed = True
+            continue
+
+        if mtime != dirs[rel]["mtime"]:
+            old_subdirs = set(dirs[rel]["subdirs"])
+            _scan_dir(root, rel, dirs)
+            changed = True
+
+            for name in old_subdirs - set(dirs.get(rel, {}).get("subdirs", [])):
+                gone = os.path.join(rel, name) if rel else name
+                for other in [d for d in dirs if d == gone or d.startswith(gone + os.sep)]:
+                    del dirs[other]
+
+    return dirs, changed
+
+def tokenize(text):
+    # "SuperNintendo_logo-v2" -> ["super", "nintendo", "logo", "v", "2"]
+    return [t.lower() for t in re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", text)]
+
+def trigrams(text):
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _rebuild_names(entry):
+    # In-memory search structures, rebuilt after every scan / refresh:
+    #   names     [(normalized stem, tokens, acronym, rel path, lowercase file name)]
+    #   trigrams  trigram -> ids of names containing it
+    names = []
+    grams = defaultdict(set)
+
+    for rel, d in entry["dirs"].items():
+        for f in d["files"]:
+            tokens = tokenize(os.path.splitext(f)[0])
+            # Names without ASCII letters or digits keep their own spelling
+            stem = " ".join(tokens) or os.path.splitext(f)[0].lower()
+            acronym = "".join(t[0] for t in tokens if not t.isdigit())
+
+            for g in trigrams(stem):
+                grams[g].add(len(names))
+            names.append((stem, tokens, acronym, os.path.join(rel, f) if rel else f, f.lower()))
+
+    entry["names"] = names
+    entry["trigrams"] = grams
+
+def _refresh(root):
+    try:
+        with _lock:
+            entry = _load_roots()[root]
+            dirs = entry["dirs"]
+
+        dirs, changed = _refresh_dirs(root, dirs)
+
+        with _lock:
+            entry["checked_at"] = time.time()
+            if changed:
+                entry["dirs"] = dirs
+                _rebuild_names(entry)
+                _save_roots()
+    finally:
+        with _lock:
+            _refreshing.discard(root)
+
+def _get_root(root):
+    root = os.path.abspath(root)
+
+    with _lock:
+        roots = _load_roots()
+        entry = roots.get(root)
+
+        if entry is None:
+            # First scan of this folder happens inline
+            dirs = {}
+            _scan_dir(root, "", dirs)
+            entry = {"dirs": dirs, "checked_at": time.time()}
+            _rebuild_names(entry)
+            roots[root] = entry
+            _save_roots()
+
+        elif time.time() - entry["checked_at"] > REFRESH_INTERVAL and root not in _refreshing:
+            _refreshing.add(root)
+            threading.Thread(target=_refresh, args=(root,), daemon=True).start()
+
+        return root, entry
+
+
+# ---------------- SEARCH ----------------
+
+def set_aliases(extra):
+    # extra: {"alias": ["name", ...]} merged over DEFAULT_ALIASES
+    global _aliases
+    _aliases = dict(DEFAULT_ALIASES)
+    for key, names in (extra or {}).items():
+        _aliases[key.lower()] = list(names)
+
+def _score(query, name):
+    stem, tokens, acronym = name[:3]
+    compact = stem.replace(" ", "")
+    q_tokens = query.split()
+
+    if stem == query or compact == query.replace(" ", ""):
+        return 100
+    if stem.startswith(query):
+        return 85
+    if all(any(t.startswith(qt) for t in tokens) for qt in q_tokens):
+        return 75
+    if query in stem or query.replace(" ", "") in compact:
+        return 60
+    if acronym == query.replace(" ", ""):
+        return 55
+    return 0
+
+def _rank(query, entry, raw=None):
+    # raw: the query as typed, lowercased, for plain substring matching
+    names = entry["names"]
+    scores = {}
+
+    aliases = _aliases.get(query) or _aliases.get(query.replace(" ", ""), [])
+    expansions = [(query, 1.0)] + [
+        (" ".join(tokenize(a)), ALIAS_WEIGHT) for a in aliases
+    ]
+
+    for text, weight in expansions:
+        q_grams = trigrams(text)
+
+        # Candidates share at least one trigram; very short queries
+        # have no useful trigrams and fall back to scanning every name.
+        if len(text) >= 3:
+            hits = defaultdict(int)
+            for g in q_grams:
+                for i in entry["trigrams"].get(g, ()):
+                    hits[i] += 1
+        else:
+            hits = {i: 0 for i in range(len(names))}
+
+        for i, shared in hits.items():
+            score = _score(text, names[i])
+            # Fuzzy matching only applies to what was typed; on an alias
+            # it turns "super nintendo" into every other Nintendo
+            if not score and q_grams and weight == 1.0:
+                similarity = shared / len(q_grams | trigrams(names[i][0]))
+                if similarity >= MIN_TRIGRAM_SIMILARITY:
+                    score = 50 * similarity
+            score *= weight
+            if score > scores.get(i, 0):
+                scores[i] = score
+
+    # Substrings across token boundaries ("eoge" in "NeoGeo") and outside
+    # ASCII share no trigram with the normalized stem; match them directly
+    if raw:
+        for i, name in enumerate(names):
+            if raw in name[4] and scores.get(i, 0) < 60:
+                scores[i] = 60
+
+    return scores
+
+def search_ranked(query, root):
+    # [(score, path)] best first
+    root, entry = _get_root(root)
+    raw = query.lower()
+    q = " ".join(tokenize(query)) or raw.strip()
+    names = entry["names"]
+
+    ranked = [
+        (score, os.path.join(root, names[i][3]))
+        for i, score in _rank(q, entry, raw).items()
+    ]
+    ranked.sort(key=lambda r: (-r[0], r[1].lower()))
+    return ranked
+
+def search(query, roots, limit=None):
+    # Best matches across one or more folders, as paths
+    if isinstance(roots, str):
+        roots = [roots]
+
+    ranked = []
+    for root in roots:
+        ranked.extend(search_ranked(query, root))
+
+    ranked.sort(key=lambda r: (-r[0], r[1].lower()))
+    return [path for _, path in ranked[:limit]]
@@ -1,240 +1,211 @@
-import requests
-from PIL import Image, ImageTk, ImageDraw
-from io import BytesIO
+import time
+STARTUP_T0 = time.perf_counter()  # time-to-first-window is measured from here
+
+from PIL import Image, ImageTk
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import json
 import os
+import gc
 import threading
 import sys
 import subprocess
-import re
 import webbrowser
-from datetime import datetime
-
-def resource_path(relative_path):
-    try:
-        base_path = sys._MEIPASS
-    except AttributeError:
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
+import bisect
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from renderer import (
+    TEMPLATES, resource_path, fit_inside, render_card, load_template_thumb,
+    card_size, open_image,
+    sanitize_filename, card_filename, logo_name_from_path
+)
+import perf
+import png_writer
+import profiling
+from perf import stage
+from http_client import cached_get_json, set_offline, OfflineError
+from thumb_cache import (
+    fetch_thumbs, load_thumb, save_thumb, thumb_path,
+    prune_in_background as prune_thumb_cache
+)
+import config_store
+import icon_index
+import web_store
+from web_store import WEB_LOGO_DIR, load_image_from_url
 
 # ---------------- CONFIG ----------------
 
-CONFIG_FILE = "config.json"
-
-CLEAR_W = 609
-CLEAR_H = 840
-
-T3_MAX_HEIGHT = 840
-T3_OVERFLOW_PAD = 120
-
-T4_POSTER_W = 619
-T4_POSTER_H = 834
-T4_POSTER_Y = 80
-
-TEMPLATES = {
-    "Black with Pins": {
-        "image_path": "templates/template_1.png",
-        "center": {
-            "x": 10,
-            "y": 59,
-            "w": 597,
-            "h": 855
-        },
-        "footer": {
-            "height": 90,
-            "logo_height": 46,
-            "max_width": 300,
-            "logo_margin": 25
-        },
-        "mode": "framed"
-    },
-
-    "White with Pins": {
-        "image_path": "templates/template_2.png",
-        "center": {
-            "x": 14,
-            "y": 63,
-            "w": 591,
-            "h": 849
-        },
-        "footer": {
-            "height": 90,
-            "logo_height": 46,
-            "max_width": 300,
-            "logo_margin": 25
-        },
-        "mode": "framed"
-    },
-
-    "HuCard Style": {
-        "image_path": "templates/template_3.png",
-        "poster_y": 150,  # Perfect starting point
-        "header_logo": {
-            "height": 63,
-            "max_width": 250,
-            "top_margin": 62,
-            "left_margin": 24
-        },
-        "mode": "layered"
-    },
-
-    "Black": {
-        "image_path": "templates/template_4.png",
-        "header_logo": {
-            "max_height": 62,
-            "max_width": 300,
-            "top_margin": 10
-        },
-        "mode": "framed-top-logo"
-    },
-
-    "White": {
-        "image_path": "templates/template_5.png",
-        "header_logo": {
-            "max_height": 62,
-            "max_width": 300,
-            "top_margin": 10
-        },
-        "mode": "framed-top-logo"
-    },
-
-    "Poster Only": {
-        "image_path": "templates/template_6.png",
-        "size": {
-            "w": 619,
-            "h": 994
-        },
-        "corner_radius": 22,
-        "mode": "full-poster-rounded"
-    }
-}
-
-
 THUMB_W = 160
 THUMB_H = 240
 ICON_THUMB_SIZE = 160
 ICON_PADDING = 16
+ICON_PAGE_SIZE = 24  # system logo thumbnails decoded per page (8 rows)
+ICON_LOAD_WORKERS = 4
+ICON_PAGE_TRIGGER = 0.85  # load the next page past this scroll fraction
 THUMBS_PER_ROW = 3
-TEMPLATE_THUMB_W = 140
+THUMB_CELL_PAD = 18  # button border + spacing around each thumbnail
+THUMB_OVERSCAN_ROWS = 2  # rows materialized beyond the viewport
+TEMPLATE_THUMB_W = 140  # pre-rendered at build time, see build.yml
+
+PERF_PANEL_REFRESH_MS = 1000
 
 PREVIEW_MIN_W = 340
 PREVIEW_MIN_H = 520
+PREVIEW_THROTTLE_MS = 15  # at most one preview render per interval while dragging
+FULL_RENDER_DELAY_MS = 400
 
 API_KEY = None        # SteamGridDB
 TMDB_API_KEY = None   # TMDB
 TMDB_IMG_BASE = "https://image.tmdb.org/t/p/original"
-WEB_IMAGE_DIR = "web-images"
-WEB_POSTER_DIR = os.path.join(WEB_IMAGE_DIR, "posters")
-WEB_LOGO_DIR = os.path.join(WEB_IMAGE_DIR, "logos")
-
+TMDB_THUMB_BASE = "https://image.tmdb.org/t/p/w342"  # >= THUMB_W x THUMB_H
 
 
 # ---------------- CONFIG HELPERS ----------------
 
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-def save_config(cfg):
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
+# Settings live in config_store: read once, written in the background
 
 def load_api_key(service="steamgriddb"):
-    cfg = load_config()
-    return cfg.get(f"{service}_api_key")
+    return config_store.get(f"{service}_api_key")
 
 def save_api_key(key, service="steamgriddb"):
-    cfg = load_config()
-    cfg[f"{service}_api_key"] = key
-    save_config(cfg)
+    config_store.put(f"{service}_api_key", key)
 
 def load_output_dir():
-    return load_config().get("output_directory")
+    return config_store.get("output_directory")
 
 def save_output_dir(path):
-    cfg = load_config()
-    cfg["output_directory"] = path
-    save_config(cfg)
+    config_store.put("output_directory", path)
 
 def load_cache_posters():
-    return load_config().get("cache_web_posters", False)
+    return config_store.get("cache_web_posters", False)
 
 def save_cache_posters(value: bool):
-    cfg = load_config()
-    cfg["cache_web_posters"] = value
-    save_config(cfg)
+    config_store.put("cache_web_posters", value)
 
 def load_cache_logos():
-    return load_config().get("cache_web_logos", False)
+    return config_store.get("cache_web_logos", False)
 
 def save_cache_logos(value: bool):
-    cfg = load_config()
-    cfg["cache_web_logos"] = value
-    save_config(cfg)
+    config_store.put("cache_web_logos", value)
 
 def load_search_cached_logos():
-    return load_config().get("search_cached_web_logos", False)
+    return config_store.get("search_cached_web_logos", False)
 
 def save_search_cached_logos(value: bool):
-    cfg = load_config()
-    cfg["search_cached_web_logos"] = value
-    save_config(cfg)
+    config_store.put("search_cached_web_logos", value)
+
+def load_offline_mode():
+    return config_store.get("offline_mode", False)
+
+def save_offline_mode(value: bool):
+    config_store.put("offline_mode", value)
+
+def load_web_cache_budget():
+    return config_store.get("web_cache_budget_mb", web_store.DEFAULT_BUDGET_MB)
+
+def save_web_cache_budget(mb: int):
+    config_store.put("web_cache_budget_mb", mb)
+
+def load_source_state_budget():
+    # MB of in-memory thumbnails kept for switching between sources,
+    # shared with recently used full-size posters
+    return config_store.get("source_state_budget_mb", 64)
+
+def load_download_workers():
+    # None falls back to the per-host defaults in http_client
+    return config_store.get("download_workers_per_host")
+
+def load_icon_aliases():
+    # Extra search aliases, e.g. {"snes": ["super nintendo"]}
+    return config_store.get("icon_aliases", {})
+
+def load_profiling_mode():
+    return config_store.get("profiling_mode", False)
+
+def save_profiling_mode(value: bool):
+    config_store.put("profiling_mode", value)
+
+def load_png_preset():
+    return config_store.get("png_compression", png_writer.DEFAULT_PNG_PRESET)
+
+def save_png_preset(preset):
+    config_store.put("png_compression", preset)
 
 def load_icon_pack_dir():
-    return load_config().get("icon_pack_directory")
+    return config_store.get("icon_pack_directory")
 
 def save_icon_pack_dir(path):
-    cfg = load_config()
-    cfg["icon_pack_directory"] = path
-    save_config(cfg)
+    config_store.put("icon_pack_directory", path)
+
+def thumb_nbytes(img):
+    return img.width * img.height * len(img.getbands())
+
+def icon_thumb_key(path):
+    # Thumb cache key for a local icon; changes when the file does
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = 0
+    return f"file:{os.path.abspath(path)}|{mtime}"
+
+def load_icon_thumb(path):
+    # Square icon thumbnail; served from the thumb cache while the file
+    # is unchanged, decoded and cached otherwise
+    key = icon_thumb_key(path)
+    size = (ICON_THUMB_SIZE, ICON_THUMB_SIZE)
+
+    thumb = load_thumb(key, size)
+    if thumb is None:
+        with Image.open(path) as img:
+            thumb = fit_inside(img.convert("RGBA"), *size)
+        save_thumb(key, size, thumb)
+    return thumb
+
+_placeholder_thumbs = {}
+
+def placeholder_thumb(size):
+    # Stands in for a spilled thumbnail whose cache file has since been
+    # pruned, so the cell stays in place and clickable
+    thumb = _placeholder_thumbs.get(size)
+    if thumb is None:
+        thumb = _placeholder_thumbs[size] = Image.new("RGBA", size, (128, 128, 128, 255))
+    return thumb
 
 def headers():
     return {"Authorization": f"Bearer {API_KEY}"}
 
-def sanitize_filename(name):
-    name = re.sub(r'[<>:"/\\|?*]', "", name)
-    return re.sub(r"\s+", " ", name).strip()
-
 # ---------------- STEAMGRIDDB ----------------
 
 def search_games(name):
-    r = requests.get(
+    return cached_get_json(
         f"https://www.steamgriddb.com/api/v2/search/autocomplete/{name}",
+        "steam_search",
         headers=headers()
-    )
-    r.raise_for_status()
-    return r.json()["data"]
+    )["data"]
 
 def get_grids(game_id):
-    r = requests.get(
+    return cached_get_json(
         f"https://www.steamgriddb.com/api/v2/grids/game/{game_id}",
+        "steam_grids",
         headers=headers()
-    )
-    r.raise_for_status()
-    return r.json()["data"]
+    )["data"]
 
 
 # ---------------- TMDB ----------------
 
 def tmdb_search_multi(query):
-    r = requests.get(
+    data = cached_get_json(
         "https://api.themoviedb.org/3/search/multi",
+        "tmdb_search",
         params={
             "api_key": load_api_key("tmdb"),
             "query": query,
             "include_adult": False
-        },
-        timeout=10
+        }
     )
-    r.raise_for_status()
 
     results = []
-    for item in r.json().get("results", []):
+    for item in data.get("results", []):
         if item.get("media_type") not in ("movie", "tv"):
             continue
 
@@ -260,271 +231,27 @@ def tmdb_get_posters(item):
     media_type = item["media_type"]
     tmdb_id = item["id"]
 
-    r = requests.get(
+    data = cached_get_json(
         f"https://api.themoviedb.org/3/{media_type}/{tmdb_id}/images",
+        "tmdb_images",
         params={
             "api_key": load_api_key("tmdb"),
             "include_image_language": "en,null"
-        },
-        timeout=10
-    )
-    r.raise_for_status()
-
-    return r.json().get("posters", [])
-
-def search_system_icons(query, root):
-    results = []
-    q = query.lower()
-
-    for base, _, files in os.walk(root):
-        for f in files:
-            if not f.lower().endswith((".png", ".jpg", ".jpeg", ".webp")):
-                continue
-            if q in f.lower():
-                results.append(os.path.join(base, f))
-
-    return results
-
-
-# ---------------- IMAGE HELPERS ----------------
-
-def fit_inside(img, max_w, max_h):
-    scale = min(max_w / img.width, max_h / img.height)
-    new_w = int(img.width * scale)
-    new_h = int(img.height * scale)
-
-    resized = img.resize((new_w, new_h), Image.LANCZOS)
-
-    canvas = Image.new("RGBA", (max_w, max_h), (0, 0, 0, 0))
-    x = (max_w - new_w) // 2
-    y = (max_h - new_h) // 2
-    canvas.paste(resized, (x, y), resized)
-
-    return canvas
-
-def maybe_cache_web_image(img, url, kind="poster"):
-    if kind == "poster" and not load_cache_posters():
-        return img
-    if kind == "logo" and not load_cache_logos():
-        return img
-
-    base_dir = WEB_LOGO_DIR if kind == "logo" else WEB_POSTER_DIR
-    os.makedirs(base_dir, exist_ok=True)
-
-    # Always normalize cached web images to PNG
-    name = os.path.basename(url.split("?")[0])
-    name = os.path.splitext(name)[0] + ".png"
-
-    path = os.path.join(base_dir, name)
-
-    try:
-        img = img.convert("RGBA")
-        img.save(path, format="PNG")  # explicit format fixes JPG/WebP issues
-        print(f"Cached web image → {path}")
-    except Exception as e:
-        print("Failed to cache web image:", e)
-
-    return img
-
-def load_image_from_url(url, timeout=10):
-    if not url.lower().startswith(("http://", "https://")):
-        raise ValueError("Only http(s) URLs are supported")
-
-    r = requests.get(url, timeout=timeout)
-    r.raise_for_status()
-
-    return Image.open(BytesIO(r.content)).convert("RGBA")
-
-def cover_image(img, w, h):
-    ratio = max(w / img.width, h / img.height)
-    r = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.LANCZOS)
-    x = (r.width - w) // 2
-    y = (r.height - h) // 2
-    return r.crop((x, y, x + w, y + h))
-
-def cover_image_top(img, w, h):
-    ratio = max(w / img.width, h / img.height)
-    r = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.LANCZOS)
-    x = (r.width - w) // 2
-    return r.crop((x, 0, x + w, h))
-
-def cover_image_bottom(img, w, h):
-    ratio = max(w / img.width, h / img.height)
-    r = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.LANCZOS)
-    x = (r.width - w) // 2
-    y = r.height - h
-    return r.crop((x, y, x + w, y + h))
-
-def cover_image_manual(img, w, h, offset):
-    ratio = max(w / img.width, h / img.height)
-    r = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.LANCZOS)
-
-    x = (r.width - w) // 2
-    max_y = r.height - h
-
-    # Map slider (0–1000) to actual vertical range (0–max_y)
-    if max_y > 0:
-        y = int((offset / 1000) * max_y)
-    else:
-        y = 0
-
-    return r.crop((x, y, x + w, y + h))
-
-
-def apply_rounded_corners(img, radius):
-    mask = Image.new("L", img.size, 0)
-    draw = ImageDraw.Draw(mask)
-
-    draw.rounded_rectangle(
-        (0, 0, img.width, img.height),
-        radius=radius,
-        fill=255
-    )
-
-    out = Image.new("RGBA", img.size)
-    out.paste(img, (0, 0), mask)
-    return out
-
-def apply_rounded_mask(img, radius):
-    mask = Image.new("L", img.size, 0)
-    draw = ImageDraw.Draw(mask)
-
-    draw.rounded_rectangle(
-        (2, 2, img.width - 2, img.height - 2),
-        radius=radius - 2,
-        fill=255
-    )
-
-    out = Image.new("RGBA", img.size, (0, 0, 0, 0))
-    out.paste(img, (0, 0), mask)
-    return out
-
-# --- HORIZONTAL HELPERS ---
-
-def cover_image_left(img, w, h):
-    ratio = max(w / img.width, h / img.height)
-    r = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.LANCZOS)
-    y = (r.height - h) // 2
-    return r.crop((0, y, w, y + h))
-
-def cover_image_right(img, w, h):
-    ratio = max(w / img.width, h / img.height)
-    r = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.LANCZOS)
-    y = (r.height - h) // 2
-    x = r.width - w
-    return r.crop((x, y, x + w, y + h))
-
-def cover_image_manual_x(img, w, h, offset):
-    ratio = max(w / img.width, h / img.height)
-    r = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.LANCZOS)
-    y = (r.height - h) // 2
-    max_x = r.width - w
-    x = max(0, min(max_x, int(offset)))
-    return r.crop((x, y, x + w, y + h))
-
-def fit_to_width(img, target_width):
-    scale = target_width / img.width
-    return img.resize((target_width, int(img.height * scale)), Image.LANCZOS)
-
-def force_vertical_overflow(img, min_height):
-    if img.height >= min_height:
-        return img
-    scale = min_height / img.height
-    return img.resize(
-        (int(img.width * scale), int(img.height * scale)),
-        Image.LANCZOS
-    )
-
-def apply_footer_logo(base, logo, cfg):
-    if isinstance(logo, str):
-        logo = Image.open(logo).convert("RGBA")
-
-    f = cfg["footer"]
-
-    # Scale by height first
-    scale = f["logo_height"] / logo.height
-    new_w = int(logo.width * scale)
-    new_h = f["logo_height"]
-
-    logo = logo.resize((new_w, new_h), Image.LANCZOS)
-
-    # Enforce max width if defined
-    if "max_width" in f and logo.width > f["max_width"]:
-        scale = f["max_width"] / logo.width
-        logo = logo.resize(
-            (f["max_width"], int(logo.height * scale)),
-            Image.LANCZOS
-        )
-
-    y = base.height - f["height"] + (f["height"] - logo.height) // 2
-    base.paste(logo, (f["logo_margin"], y), logo)
-
-
-def apply_header_logo(base, logo, cfg):
-    if isinstance(logo, str):
-        logo = Image.open(logo).convert("RGBA")
-
-    h = cfg["header_logo"]
-
-    # --- Resize by height first ---
-    scale = h["height"] / logo.height
-    logo = logo.resize(
-        (int(logo.width * scale), h["height"]),
-        Image.LANCZOS
+        }
     )
 
-    # --- Enforce max width if needed ---
-    if logo.width > h["max_width"]:
-        scale = h["max_width"] / logo.width
-        logo = logo.resize(
-            (h["max_width"], int(logo.height * scale)),
-            Image.LANCZOS
-        )
-
-    # --- LEFT aligned (fixed) ---
-    x = h["left_margin"]
-
-    # --- VERTICALLY CENTERED inside header height ---
-    header_h = h["height"]
-    y = h["top_margin"] + (header_h - logo.height) // 2
-
-    base.paste(logo, (x, y), logo)
+    return data.get("posters", [])
 
-def apply_top_center_logo(base, logo, cfg):
-    if isinstance(logo, str):
-        logo = Image.open(logo).convert("RGBA")
+def search_system_icons(query, roots, limit=None):
+    # Answered from the persistent filename index, not a full os.walk;
+    # best-ranked matches across all roots first
+    return icon_index.search(query, roots, limit=limit)
 
-    h = cfg["header_logo"]
-
-    # Scale by height first
-    if logo.height > h["max_height"]:
-        scale = h["max_height"] / logo.height
-        logo = logo.resize(
-            (int(logo.width * scale), h["max_height"]),
-            Image.LANCZOS
-        )
-
-    # Apply max width if present
-    if "max_width" in h and logo.width > h["max_width"]:
-        scale = h["max_width"] / logo.width
-        logo = logo.resize(
-            (h["max_width"], int(logo.height * scale)),
-            Image.LANCZOS
-        )
-
-    # Horizontal center
-    x = (base.width - logo.width) // 2
-
-    # Vertical center INSIDE header band
-    header_height = h["max_height"]
-    y = h["top_margin"] + (header_height - logo.height) // 2
-
-    base.paste(logo, (x, y), logo)
 
 # ---------------- GUI ----------------
 
 class App(tk.Tk):
-    def __init__(self):
+    def __init__(self, profile=False):
         super().__init__()
 
         # --- Window icon ---
@@ -545,8 +272,35 @@ class App(tk.Tk):
         self.search_cached_logos = tk.BooleanVar(
             value=load_search_cached_logos()
         )
+        self.offline_mode = tk.BooleanVar(value=load_offline_mode())
+        set_offline(self.offline_mode.get())
+
+        icon_index.set_aliases(load_icon_aliases())
+        web_store.set_budget_mb(load_web_cache_budget())
+        web_store.compact_in_background()
+        prune_thumb_cache()
+
+        # Rolling per-stage timings for the performance panel + perf.log
+        perf.enable()
+
+        # --profile turns profiling on for this session only
+        self.profiling_mode = tk.BooleanVar(value=profile or load_profiling_mode())
+        if self.profiling_mode.get():
+            profiling.enable()
+
+        # Settings that take effect as soon as they are saved
+        config_store.subscribe("offline_mode", set_offline)
+        config_store.subscribe(
+            "profiling_mode",
+            lambda on: profiling.enable() if on else profiling.disable()
+        )
+        config_store.subscribe("icon_aliases", icon_index.set_aliases)
+        config_store.subscribe("web_cache_budget_mb", self.on_web_cache_budget)
 
         self.output_image = None
+        self.output_stale = False
+        self.preview_after_id = None
+        self.full_render_after_id = None
         self.output_dir = load_output_dir()
         self.icon_pack_dir = load_icon_pack_dir()
 
@@ -556,31 +310,65 @@ class App(tk.Tk):
         self.source_var = tk.StringVar(value="steam")  # steam | tmdb
 
         self.selected_poster_image = None
+        self.full_posters = OrderedDict()  # url -> decoded poster, oldest first
+        self.full_poster_bytes = 0
         self.poster_orientation = "vertical"
         self.current_game_title = None
 
         self.template_imgs = {}
-        self.thumb_imgs = []
+        self.thumb_cells = {}  # id(state item) -> visible cell
+        self.free_thumb_cells = []
+        self.thumb_grid_after = None
+        self.thumb_scrollregion = None
         self.preview_image = None
         self.status_after_id = None
+        self.perf_panel = None
         self.search_id = 0
+        self.render_id = 0
+        self.poster_load_id = 0
+        self.startup_ms = None
+
+        # System logo results are paged: only paths are kept for the whole
+        # result list, thumbnails are decoded a page at a time on scroll
+        self.icon_results = []
+        self.icon_results_next = 0
+        self.icon_page_pending = 0
+        # Logo paging has its own generation so that a SteamGridDB / TMDB
+        # search does not drop a half-loaded page and stall paging
+        self.icon_search_id = 0
+        self.icon_pool = ThreadPoolExecutor(max_workers=ICON_LOAD_WORKERS)
+
+        self.pending_renders = {}
+        self.render_cond = threading.Condition()
+        threading.Thread(target=self.render_worker, daemon=True).start()
 
         self.source_state = {
-            "steam": {"query": "", "thumbs": [], "scroll": 0.0},
-            "tmdb": {"query": "", "thumbs": [], "scroll": 0.0},
-            "system": {"query": "", "thumbs": [], "scroll": 0.0},
+            "steam": {"query": "", "thumbs": [], "slots": [], "scroll": 0.0},
+            "tmdb": {"query": "", "thumbs": [], "slots": [], "scroll": 0.0},
+            "system": {"query": "", "thumbs": [], "slots": [], "scroll": 0.0},
         }
+        self.state_thumb_bytes = 0
+        self.state_budget_bytes = load_source_state_budget() * 1024 * 1024
 
         self.build_ui()
         self.update_output_folder_button()
 
-    def set_logo_name_from_path(self, path):
-        if not path:
-            self.logo_name = None
+        self.bind("<Map>", self.on_first_map, add="+")
+
+    def on_first_map(self, event):
+        if event.widget is not self or self.startup_ms is not None:
             return
 
-        name = os.path.splitext(os.path.basename(path))[0]
-        self.logo_name = sanitize_filename(name)
+        self.startup_ms = (time.perf_counter() - STARTUP_T0) * 1000
+        print(f"Time to first window: {self.startup_ms:.0f} ms")
+        self.show_status(f"Started in {self.startup_ms:.0f} ms")
+
+    def on_web_cache_budget(self, mb):
+        web_store.set_budget_mb(mb or web_store.DEFAULT_BUDGET_MB)
+        web_store.compact_in_background()
+
+    def set_logo_name_from_path(self, path):
+        self.logo_name = logo_name_from_path(path)
 
     def save_current_source_state(self):
         src = self.source_var.get()
@@ -598,91 +386,207 @@ class App(tk.Tk):
         if state["query"]:
             self.game_entry.insert(0, state["query"])
 
-        # Clear thumbnails
-        for w in self.thumb_frame.winfo_children():
-            w.destroy()
-
-        self.thumb_imgs.clear()
-
-        # Restore thumbnails
-        for item in state["thumbs"]:
-            self._restore_thumb(src, item)
+        if self.loading_label.winfo_exists():
+            self.loading_label.grid_forget()
+        if state["thumbs"] and self.placeholder_label.winfo_exists():
+            self.placeholder_label.grid_forget()
 
+        # The grid draws straight from the source state; spilled
+        # thumbnails are read back from the thumb cache once visible
+        self.refresh_thumb_grid()
         self.after(50, lambda: self.canvas.yview_moveto(state["scroll"]))
+        if src == "system":
+            # Resume logo paging that waited while another source was shown
+            self.after(60, lambda: self.on_thumb_scroll(*self.canvas.yview()))
+        self.after(100, lambda: self.memory_snapshot(f"restore_{src}"))
 
     def on_source_change(self):
         self.save_current_source_state()
         self.restore_source_state()
 
-    def _restore_thumb(self, src, item):
+    def thumb_command(self, src, ref):
         if src == "steam":
-            grid, data = item
-            self._add_steam_thumb_no_cache(grid, data)
-        elif src == "tmdb":
-            self._add_tmdb_thumb_no_cache(item)
-        elif src == "system":
-            data, path = item
-            self._add_system_icon_thumb_no_cache(data, path)
-
-    def _add_steam_thumb_no_cache(self, grid, data):
-        i = len(self.thumb_imgs)
-
-        img = Image.open(BytesIO(data)).convert("RGBA")
-        img = img.resize((THUMB_W, THUMB_H), Image.LANCZOS)
-
-        tk_img = ImageTk.PhotoImage(img)
-        self.thumb_imgs.append(tk_img)
-
-        ttk.Button(
-            self.thumb_frame,
-            image=tk_img,
-            command=lambda g=grid: self.apply_steam_poster(g)
-        ).grid(
-            row=(i // THUMBS_PER_ROW) + 1,
-            column=i % THUMBS_PER_ROW,
-            padx=5,
-            pady=5
-        )
-
-    def _add_tmdb_thumb_no_cache(self, data):
-        i = len(self.thumb_imgs)
-
-        img = Image.open(BytesIO(data)).convert("RGBA")
-        img = img.resize((THUMB_W, THUMB_H), Image.LANCZOS)
+            return lambda: self.apply_steam_poster(ref)
+        if src == "tmdb":
+            return lambda: self.apply_tmdb_poster(ref)
+        return lambda: self.apply_system_icon(ref)
+
+    # -------- SOURCE STATE --------
+
+    def add_thumb(self, src, slot, ref, thumb_url, thumb):
+        # Per-source state keeps only the scaled thumbnail and a reference
+        # to the full asset (grid / TMDB path / icon path), in result order
+        # even when downloads finish out of order. Past the memory budget,
+        # thumbnails are spilled to the on-disk thumb cache.
+        state = self.source_state[src]
 
-        tk_img = ImageTk.PhotoImage(img)
-        self.thumb_imgs.append(tk_img)
+        pos = bisect.bisect(state["slots"], slot)
+        state["slots"].insert(pos, slot)
+        state["thumbs"].insert(pos, {
+            "ref": ref,
+            "thumb_url": thumb_url,
+            "size": thumb.size,
+            "thumb": thumb
+        })
+        self.state_thumb_bytes += thumb_nbytes(thumb)
+
+        if self.state_memory_bytes() > self.state_budget_bytes:
+            self.trim_full_posters()
+        if self.state_memory_bytes() > self.state_budget_bytes:
+            self.spill_source_state(src)
+
+        if src == self.source_var.get():
+            if self.placeholder_label.winfo_exists():
+                self.placeholder_label.grid_forget()
+            self.refresh_thumb_grid()
+
+    def state_memory_bytes(self):
+        # Grid thumbnails and decoded full posters share one budget
+        return self.state_thumb_bytes + self.full_poster_bytes
+
+    def trim_full_posters(self):
+        # Decoded originals (~24 MB for a TMDB original) go before any
+        # thumbnail is spilled; the newest one is on screen and stays
+        while len(self.full_posters) > 1 and self.state_memory_bytes() > self.state_budget_bytes:
+            _, poster = self.full_posters.popitem(last=False)
+            self.full_poster_bytes -= thumb_nbytes(poster)
+
+    def spill_source_state(self, current):
+        # Hidden sources go first, then the oldest thumbnails of the current one
+        order = [s for s in self.source_state if s != current] + [current]
+
+        for src in order:
+            for item in self.source_state[src]["thumbs"]:
+                if self.state_memory_bytes() <= self.state_budget_bytes:
+                    return
+                if item["thumb"] is None or item.get("unspillable"):
+                    continue
 
-        ttk.Button(
-            self.thumb_frame,
-            image=tk_img,
-            command=lambda d=data: self.apply_tmdb_poster(d)
-        ).grid(
-            row=(i // THUMBS_PER_ROW) + 1,
-            column=i % THUMBS_PER_ROW,
-            padx=5,
-            pady=5
-        )
+                # Keep the thumbnail in memory unless it is safely on disk;
+                # one failed write is enough, do not retry on every add
+                if not (
+                        os.path.exists(thumb_path(item["thumb_url"], item["size"])) or
+                        save_thumb(item["thumb_url"], item["size"], item["thumb"])
+                ):
+                    item["unspillable"] = True
+                    continue
 
-    def _add_system_icon_thumb_no_cache(self, data, path):
-        i = len(self.thumb_imgs)
+                self.state_thumb_bytes -= thumb_nbytes(item["thumb"])
+                item["thumb"] = None
+
+    def clear_source_thumbs(self, src):
+        for item in self.source_state[src]["thumbs"]:
+            if item["thumb"] is not None:
+                self.state_thumb_bytes -= thumb_nbytes(item["thumb"])
+        self.source_state[src]["thumbs"].clear()
+        self.source_state[src]["slots"].clear()
+
+        if src == "system":
+            # Stop paging through the previous result list; pages still in
+            # flight belong to the old icon_search_id and are dropped
+            self.icon_search_id += 1
+            self.icon_results = []
+            self.icon_results_next = 0
+            self.icon_page_pending = 0
+
+        if src == self.source_var.get():
+            self.refresh_thumb_grid()
+
+    def post_thumb(self, search_id, add):
+        # Called from download workers; drop results of superseded searches
+        self.after(0, lambda: add() if search_id == self.search_id else None)
+
+    def post_icon(self, icon_search_id, add):
+        # Called from icon workers; drop pages of superseded logo searches
+        self.after(0, lambda: add() if icon_search_id == self.icon_search_id else None)
+
+    # -------- THUMBNAIL GRID --------
+
+    # Only rows near the viewport get a button and a PhotoImage. Cells are
+    # canvas windows recycled while scrolling; a cell's PhotoImage is
+    # repainted in place when the next thumbnail has the same size.
+
+    def refresh_thumb_grid(self):
+        if self.thumb_grid_after is None:
+            self.thumb_grid_after = self.after_idle(self.layout_thumb_grid)
+
+    def layout_thumb_grid(self):
+        self.thumb_grid_after = None
+        items = self.source_state[self.source_var.get()]["thumbs"]
+
+        # Loading / placeholder labels sit above the grid; the empty
+        # frame is hidden so it cannot cover the first row
+        has_header = bool(self.thumb_frame.grid_slaves())
+        top = self.thumb_frame.winfo_reqheight() if has_header else 0
+        self.canvas.itemconfigure(self.thumb_header, state="normal" if has_header else "hidden")
+
+        if items:
+            cell_w = items[0]["size"][0] + THUMB_CELL_PAD
+            cell_h = items[0]["size"][1] + THUMB_CELL_PAD
+            rows = -(-len(items) // THUMBS_PER_ROW)
+        else:
+            cell_w = cell_h = 1
+            rows = 0
+
+        region = (0, 0, int(self.canvas["width"]), max(top + rows * cell_h, 1))
+        if region != self.thumb_scrollregion:
+            self.thumb_scrollregion = region
+            self.canvas.configure(scrollregion=region)
+
+        view_top = self.canvas.canvasy(0)
+        view_bottom = view_top + self.canvas.winfo_height()
+        first_row = max(0, int((view_top - top) // cell_h) - THUMB_OVERSCAN_ROWS)
+        last_row = min(rows - 1, int((view_bottom - top) // cell_h) + THUMB_OVERSCAN_ROWS)
+
+        visible = {}
+        for i in range(first_row * THUMBS_PER_ROW, min(len(items), (last_row + 1) * THUMBS_PER_ROW)):
+            visible[id(items[i])] = i
+
+        # Release cells that scrolled out of range
+        for key in [k for k in self.thumb_cells if k not in visible]:
+            cell = self.thumb_cells.pop(key)
+            self.canvas.itemconfigure(cell["win"], state="hidden")
+            cell["item"] = None
+            self.free_thumb_cells.append(cell)
+
+        center = region[2] / 2
+        for key, i in visible.items():
+            item = items[i]
+            cell = self.thumb_cells.get(key)
+
+            if cell is None:
+                thumb = (
+                    item["thumb"] or
+                    load_thumb(item["thumb_url"], item["size"]) or
+                    placeholder_thumb(item["size"])
+                )
+                cell = self.free_thumb_cells.pop() if self.free_thumb_cells else self.new_thumb_cell()
+                self.bind_thumb_cell(cell, thumb, self.thumb_command(self.source_var.get(), item["ref"]))
+                # Holding the item keeps its id from being reused
+                cell["item"] = item
+                self.thumb_cells[key] = cell
+
+            col = i % THUMBS_PER_ROW
+            self.canvas.coords(
+                cell["win"],
+                center + (col - (THUMBS_PER_ROW - 1) / 2) * cell_w,
+                top + (i // THUMBS_PER_ROW) * cell_h + THUMB_CELL_PAD / 2
+            )
+            self.canvas.itemconfigure(cell["win"], state="normal")
 
-        img = Image.open(BytesIO(data)).convert("RGBA")
-        img = fit_inside(img, ICON_THUMB_SIZE, ICON_THUMB_SIZE)
+    def new_thumb_cell(self):
+        btn = ttk.Button(self.canvas)
+        win = self.canvas.create_window(0, 0, window=btn, anchor="n", state="hidden")
+        return {"btn": btn, "win": win, "photo": None, "item": None}
 
-        tk_img = ImageTk.PhotoImage(img)
-        self.thumb_imgs.append(tk_img)
+    def bind_thumb_cell(self, cell, thumb, command):
+        photo = cell["photo"]
+        if photo is not None and (photo.width(), photo.height()) == thumb.size:
+            photo.paste(thumb)
+        else:
+            photo = cell["photo"] = ImageTk.PhotoImage(thumb)
 
-        ttk.Button(
-            self.thumb_frame,
-            image=tk_img,
-            command=lambda p=path: self.apply_system_icon(p)
-        ).grid(
-            row=(i // THUMBS_PER_ROW) + 1,
-            column=i % THUMBS_PER_ROW,
-            padx=5,
-            pady=5
-        )
+        cell["btn"].configure(image=photo, command=command)
 
     def ensure_api_key(self, service="steamgriddb"):
         global API_KEY, TMDB_API_KEY
@@ -837,13 +741,8 @@ class App(tk.Tk):
         frame = ttk.LabelFrame(self, text="Select Template")
         frame.pack(pady=10)
 
-        for name, cfg in TEMPLATES.items():
-            img = Image.open(resource_path(cfg["image_path"]))
-            img = img.resize(
-                (TEMPLATE_THUMB_W, int(TEMPLATE_THUMB_W * img.height / img.width)),
-                Image.LANCZOS
-            )
-            tk_img = ImageTk.PhotoImage(img)
+        for name in TEMPLATES:
+            tk_img = ImageTk.PhotoImage(load_template_thumb(name, TEMPLATE_THUMB_W))
             self.template_imgs[name] = tk_img
 
             ttk.Radiobutton(
@@ -977,7 +876,8 @@ class App(tk.Tk):
 
         sb = ttk.Scrollbar(selector_container, orient="vertical", command=self.canvas.yview)
         sb.pack(side="left", fill="y")
-        self.canvas.configure(yscrollcommand=sb.set)
+        self.thumb_scrollbar = sb
+        self.canvas.configure(yscrollcommand=self.on_thumb_scroll)
         # Global mouse wheel scrolling for thumbnail canvas
         if sys.platform.startswith("linux"):
             self.bind_all("<Button-4>", self._on_mousewheel)
@@ -986,12 +886,10 @@ class App(tk.Tk):
             self.bind_all("<MouseWheel>", self._on_mousewheel)
 
         self.thumb_frame = ttk.Frame(self.canvas)
-        self.canvas.create_window((260, 0), window=self.thumb_frame, anchor="n")
+        self.thumb_header = self.canvas.create_window((260, 0), window=self.thumb_frame, anchor="n")
 
-        self.thumb_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        self.thumb_frame.bind("<Configure>", lambda e: self.refresh_thumb_grid())
+        self.canvas.bind("<Configure>", lambda e: self.refresh_thumb_grid())
 
         self.loading_label = ttk.Label(
             self.thumb_frame,
@@ -1034,6 +932,12 @@ class App(tk.Tk):
             command=self.open_settings
         ).pack(side="left", padx=10)
 
+        ttk.Button(
+            bottom,
+            text="Performance",
+            command=self.open_perf_panel
+        ).pack(side="left", padx=(0, 10))
+
         ttk.Button(
             bottom,
             text="Save Image",
@@ -1055,12 +959,79 @@ class App(tk.Tk):
         self.status_label = ttk.Label(bottom, text="", foreground="green")
         self.status_label.pack(side="left", padx=15)
 
+    # -------- Performance Panel --------
+
+    def open_perf_panel(self):
+        # Live rolling percentiles per stage, refreshed while open
+        if self.perf_panel is not None and self.perf_panel.winfo_exists():
+            self.perf_panel.lift()
+            return
+
+        d = tk.Toplevel(self)
+        d.title("Performance")
+        d.transient(self)
+        self.perf_panel = d
+
+        container = ttk.Frame(d, padding=15)
+        container.pack(fill="both", expand=True)
+
+        ttk.Label(
+            container,
+            text=f"Stage timings in ms (last {perf.ROLLING_WINDOW} per stage)",
+            font=("TkDefaultFont", 10, "bold")
+        ).pack(anchor="w")
+
+        columns = ("n", "last", "p50", "p90", "p99")
+        table = ttk.Treeview(container, columns=columns, height=14)
+        table.heading("#0", text="Stage")
+        table.column("#0", width=140)
+        for col in columns:
+            table.heading(col, text=col)
+            table.column(col, width=70, anchor="e")
+        table.pack(fill="both", expand=True, pady=(8, 8))
+
+        memory_label = ttk.Label(container)
+        memory_label.pack(anchor="w", pady=(0, 4))
+
+        ttk.Label(
+            container,
+            text=f"Every timing is also written to {perf.PERF_LOG_FILE}",
+            foreground="gray"
+        ).pack(anchor="w")
+
+        def refresh():
+            if not d.winfo_exists():
+                return
+
+            table.delete(*table.get_children())
+            for name, st in perf.snapshot().items():
+                table.insert("", "end", text=name, values=(
+                    st["n"],
+                    f"{st['last']:.1f}",
+                    f"{st['p50']:.1f}",
+                    f"{st['p90']:.1f}",
+                    f"{st['p99']:.1f}",
+                ))
+
+            mb = 1024 * 1024
+            memory_label.config(text=(
+                f"Memory: thumbnails {self.state_thumb_bytes / mb:.1f} MB, "
+                f"{len(self.full_posters)} full posters {self.full_poster_bytes / mb:.1f} MB "
+                f"(budget {self.state_budget_bytes / mb:.0f} MB)"
+            ))
+            d.after(PERF_PANEL_REFRESH_MS, refresh)
+
+        ttk.Button(container, text="Reset", command=perf.reset).pack(side="left")
+        ttk.Button(container, text="Close", command=d.destroy).pack(side="right")
+
+        refresh()
+
     # -------- Settings Menu --------
 
     def open_settings(self):
         d = tk.Toplevel(self)
         d.title("Settings")
-        d.geometry("520x700")
+        d.geometry("520x860")
         d.transient(self)
         d.grab_set()
 
@@ -1110,6 +1081,31 @@ class App(tk.Tk):
             command=set_output_dir_from_settings
         ).pack(anchor="w")
 
+        png_row = ttk.Frame(container)
+        png_row.pack(anchor="w", pady=(8, 0))
+
+        ttk.Label(png_row, text="PNG compression:").pack(side="left")
+
+        png_preset_var = tk.StringVar(value=load_png_preset())
+        png_box = ttk.Combobox(
+            png_row,
+            textvariable=png_preset_var,
+            values=list(png_writer.PNG_PRESETS),
+            state="readonly",
+            width=10
+        )
+        png_box.pack(side="left", padx=(6, 0))
+        png_box.bind(
+            "<<ComboboxSelected>>",
+            lambda e: save_png_preset(png_preset_var.get())
+        )
+
+        ttk.Label(
+            png_row,
+            text="fast = larger files, smallest = slowest",
+            foreground="gray"
+        ).pack(side="left", padx=(8, 0))
+
         ttk.Separator(container).pack(fill="x", pady=15)
 
         # ================= SYSTEM LOGO PACK FOLDER =================
@@ -1181,6 +1177,69 @@ class App(tk.Tk):
             command=toggle_cached_logo_search
         ).pack(anchor="w")
 
+        def toggle_offline_mode():
+            save_offline_mode(self.offline_mode.get())
+
+        ttk.Checkbutton(
+            container,
+            text="Offline mode (use cached search results only)",
+            variable=self.offline_mode,
+            command=toggle_offline_mode
+        ).pack(anchor="w")
+
+        ttk.Checkbutton(
+            container,
+            text=f"Profiling mode (write reports to {profiling.PROFILE_DIR}/)",
+            variable=self.profiling_mode,
+            command=lambda: save_profiling_mode(self.profiling_mode.get())
+        ).pack(anchor="w")
+
+        cache_row = ttk.Frame(container)
+        cache_row.pack(anchor="w", pady=(8, 0))
+
+        ttk.Label(cache_row, text="Web image cache limit (MB):").pack(side="left")
+
+        budget_var = tk.IntVar(value=load_web_cache_budget())
+
+        def apply_cache_budget(event=None):
+            try:
+                mb = max(1, int(budget_var.get()))
+            except (tk.TclError, ValueError):
+                return
+            save_web_cache_budget(mb)
+            d.after(500, refresh_cache_stats)
+
+        budget_box = ttk.Spinbox(
+            cache_row,
+            from_=50,
+            to=100000,
+            increment=50,
+            width=8,
+            textvariable=budget_var,
+            command=apply_cache_budget
+        )
+        budget_box.pack(side="left", padx=(6, 0))
+        budget_box.bind("<Return>", apply_cache_budget)
+        budget_box.bind("<FocusOut>", apply_cache_budget)
+
+        cache_stats_var = tk.StringVar()
+
+        def refresh_cache_stats():
+            st = web_store.stats()
+            cache_stats_var.set(
+                f"{st['bytes'] / 1048576:.1f} of {st['budget'] / 1048576:.0f} MB used, "
+                f"{st['blobs']} images · {st['hits']} hits, "
+                f"{st['misses']} misses, {st['evictions']} evicted"
+            )
+
+        refresh_cache_stats()
+
+        ttk.Label(
+            container,
+            textvariable=cache_stats_var,
+            foreground="gray"
+        ).pack(anchor="w", pady=(4, 0))
+
         ttk.Separator(container).pack(fill="x", pady=15)
 
         # ================= STEAMGRIDDB API KEY =================
@@ -1302,7 +1361,8 @@ class App(tk.Tk):
         if not p:
             return
 
-        img = Image.open(p).convert("RGBA")
+        img = open_image(p)
+        self.poster_load_id += 1  # supersedes a pending full poster download
         self.selected_poster_image = img
         self.poster_orientation = "horizontal" if img.width > img.height else "vertical"
         self.update_crop_labels()
@@ -1318,111 +1378,111 @@ class App(tk.Tk):
         else:
             self.crop_slider.pack_forget()
 
-        cfg = TEMPLATES[self.template_var.get()]
-
-        def crop(img, w, h):
-            mode = self.crop_mode.get()
+        # invalidate in-flight renders; only the newest result is shown
+        self.render_id += 1
 
-            if self.poster_orientation == "horizontal":
-                if mode == "top":
-                    return cover_image_left(img, w, h)
-                if mode == "bottom":
-                    return cover_image_right(img, w, h)
-                if mode == "manual":
-                    return cover_image_manual_x(img, w, h, self.crop_offset.get())
-                return cover_image(img, w, h)
-            else:
-                if mode == "top":
-                    return cover_image_top(img, w, h)
-                if mode == "bottom":
-                    return cover_image_bottom(img, w, h)
-                if mode == "manual":
-                    return cover_image_manual(img, w, h, self.crop_offset.get())
-                return cover_image(img, w, h)
-
-        # Template 6 – full poster with rounded corners (no base template, no logo)
-        if cfg.get("mode") == "full-poster-rounded":
-            if not self.selected_poster_image:
-                return
-
-            w = cfg["size"]["w"]
-            h = cfg["size"]["h"]
+        # The preview is composited at label size on every tick, throttled
+        # so a drag still renders while it lasts: a pending preview is left
+        # alone and picks up the latest settings when it fires. The
+        # full-resolution card is rendered once interaction settles (or on
+        # demand when saving). Both run on the render worker.
+        self.output_image = None
+        self.output_stale = True
 
-            poster = crop(self.selected_poster_image, w, h)
-            poster = apply_rounded_corners(
-                poster,
-                cfg.get("corner_radius", 24)
+        if not self.preview_after_id:
+            self.preview_after_id = self.after(
+                PREVIEW_THROTTLE_MS,
+                self.render_preview
             )
 
-            self.output_image = poster
-            self.update_preview(poster)
-            return
-        template_img = Image.open(resource_path(cfg["image_path"])).convert("RGBA")
-
-        # ---------------- TEMPLATE 3 ----------------
-        if cfg["mode"] == "layered":
-            base = Image.new("RGBA", template_img.size, (0, 0, 0, 0))
-
-            if self.selected_poster_image:
-                # Visible poster area = from poster_y to bottom
-                visible_h = template_img.height - cfg["poster_y"]
-
-                # Crop poster EXACTLY to visible area
-                poster = crop(self.selected_poster_image, CLEAR_W, visible_h)
+        if self.full_render_after_id:
+            self.after_cancel(self.full_render_after_id)
+        self.full_render_after_id = self.after(
+            FULL_RENDER_DELAY_MS,
+            self.render_full
+        )
 
-                # Center horizontally
-                x = (template_img.width - CLEAR_W) // 2
+    def current_render_spec(self):
+        return {
+            "template": self.template_var.get(),
+            "poster": self.selected_poster_image,
+            "logo": self.logo_image or self.logo_path,
+            "crop_mode": self.crop_mode.get(),
+            "crop_offset": self.crop_offset.get(),
+            "orientation": self.poster_orientation
+        }
 
-                # Paste poster
-                base.paste(poster, (x, cfg["poster_y"]), poster)
+    def render_preview(self):
+        self.preview_after_id = None
 
-            # Overlay template artwork
-            base.paste(template_img, (0, 0), template_img)
+        w = self.preview_label.winfo_width()
+        h = self.preview_label.winfo_height()
+        if w <= 1 or h <= 1:
+            return
 
-            # HARD ROUND FINAL IMAGE (prevents ALL bleed)
-            base = apply_rounded_mask(base, radius=22)
+        spec = self.current_render_spec()
+        card_w, card_h = card_size(spec["template"])
+        scale = min(w / card_w, h / card_h, 1.0)
 
-            if self.logo_image or self.logo_path:
-                apply_header_logo(base, self.logo_image or self.logo_path, cfg)
+        self.submit_render("preview", spec, scale)
 
-        # ---------------- TEMPLATE 4 & 5 ----------------
-        elif cfg["mode"] == "framed-top-logo":
-            base = template_img.copy()
+    def render_full(self):
+        self.full_render_after_id = None
+        self.submit_render("full", self.current_render_spec(), 1.0)
 
-            if self.selected_poster_image:
-                poster = crop(self.selected_poster_image, T4_POSTER_W, T4_POSTER_H)
-                x = (base.width - T4_POSTER_W) // 2
-                base.paste(poster, (x, T4_POSTER_Y), poster)
+    def submit_render(self, kind, spec, scale):
+        # One pending slot per kind: a newer request replaces an older one
+        # that the worker has not picked up yet (latest wins).
+        with self.render_cond:
+            self.pending_renders[kind] = (self.render_id, spec, scale)
+            self.render_cond.notify()
 
-            if self.logo_image or self.logo_path:
-                apply_top_center_logo(base, self.logo_image or self.logo_path, cfg)
+    def render_worker(self):
+        while True:
+            with self.render_cond:
+                while not self.pending_renders:
+                    self.render_cond.wait()
 
-        # ---------------- TEMPLATE 1 & 2 ----------------
-        else:
-            base = template_img.copy()
+                kind = "preview" if "preview" in self.pending_renders else "full"
+                render_id, spec, scale = self.pending_renders.pop(kind)
 
-            if self.logo_image or self.logo_path:
-                apply_footer_logo(base, self.logo_image or self.logo_path, cfg)
+            if render_id != self.render_id:
+                continue
 
-            if self.selected_poster_image:
-                c = cfg["center"]
-                poster = crop(self.selected_poster_image, c["w"], c["h"])
-                base.paste(poster, (c["x"], c["y"]), poster)
+            try:
+                # Preview renders composite at label size ("preview scaling")
+                with profiling.profile(f"{kind}_{spec['template']}"), \
+                        stage("preview" if kind == "preview" else "render"):
+                    out = render_card(**spec, scale=scale)
+            except Exception as e:
+                print("Render failed:", e)
+                continue
 
-        self.output_image = base
-        self.update_preview(base)
+            self.after(
+                0,
+                lambda k=kind, r=render_id, o=out: self.finish_render(k, r, o)
+            )
 
-    def update_preview(self, base):
-        w = self.preview_label.winfo_width()
-        h = self.preview_label.winfo_height()
-        if w <= 1 or h <= 1:
+    def finish_render(self, kind, render_id, out):
+        if render_id != self.render_id:
             return
 
-        scale = min(w / base.width, h / base.height)
-        img = base.resize(
-            (int(base.width * scale), int(base.height * scale)),
-            Image.LANCZOS
-        )
+        if kind == "preview":
+            if out is not None:
+                self.update_preview(out)
+        elif self.output_stale:
+            self.output_image = out
+            self.output_stale = False
+
+    def get_output_image(self):
+        if self.output_stale:
+            spec = self.current_render_spec()
+            with profiling.profile(f"full_{spec['template']}"), stage("render"):
+                self.output_image = render_card(**spec)
+            self.output_stale = False
+        return self.output_image
+
+    def update_preview(self, img):
         self.preview_image = ImageTk.PhotoImage(img)
         self.preview_label.configure(image=self.preview_image)
 
@@ -1430,7 +1490,7 @@ class App(tk.Tk):
 
     def search(self):
         query = self.game_entry.get().strip()
-        self.source_state[self.source_var.get()]["thumbs"].clear()
+        self.clear_source_thumbs(self.source_var.get())
         if not query:
             return
 
@@ -1449,7 +1509,7 @@ class App(tk.Tk):
 
             threading.Thread(
                 target=self.fetch_system_icons_thread,
-                args=(query, current_search_id),
+                args=(query, self.icon_search_id),
                 daemon=True
             ).start()
             return
@@ -1459,7 +1519,12 @@ class App(tk.Tk):
             if not self.ensure_api_key("steamgriddb"):
                 return
 
-            games = search_games(query)
+            try:
+                games = search_games(query)
+            except OfflineError:
+                self.show_status("Offline: no cached results for this search")
+                return
+
             game = self.pick_game(games)
             if not game:
                 return
@@ -1478,7 +1543,12 @@ class App(tk.Tk):
             if not self.ensure_api_key("tmdb"):
                 return
 
-            results = tmdb_search_multi(query)
+            try:
+                results = tmdb_search_multi(query)
+            except OfflineError:
+                self.show_status("Offline: no cached results for this search")
+                return
+
             item = self.pick_tmdb_item(results)
             if not item:
                 return
@@ -1497,14 +1567,10 @@ class App(tk.Tk):
             ).start()
 
     def show_loading(self):
-        for w in self.thumb_frame.winfo_children():
-            if w not in (self.loading_label, self.placeholder_label):
-                w.destroy()
-
         if self.placeholder_label.winfo_exists():
             self.placeholder_label.grid_forget()
 
-        self.thumb_imgs.clear()
+        self.refresh_thumb_grid()
         self.canvas.yview_moveto(0)
 
         if self.loading_label.winfo_exists():
@@ -1518,73 +1584,100 @@ class App(tk.Tk):
     # -------- STEAMGRIDDB THUMBS --------
 
     def fetch_steam_thumbs_thread(self, game_id, search_id):
-        grids = get_grids(game_id)
+        try:
+            grids = get_grids(game_id)
+        except OfflineError:
+            self.post_thumb(search_id, self.finish_offline_thumb_load)
+            return
         vertical = [g for g in grids if g["width"] < g["height"]]
 
-        for grid in vertical:
-            if search_id != self.search_id:
-                return
-            try:
-                r = requests.get(grid["url"], timeout=10)
-                r.raise_for_status()
-                self.after(
-                    0,
-                    lambda g=grid, d=r.content: self.add_steam_thumb_from_data(g, d)
-                )
-            except Exception:
-                pass
-
-        def finish():
-            if self.loading_label.winfo_exists():
-                self.loading_label.grid_forget()
-
-            if not self.thumb_imgs and self.placeholder_label.winfo_exists():
-                self.placeholder_label.grid(
-                    row=0,
-                    column=0,
-                    columnspan=THUMBS_PER_ROW,
-                    pady=30
-                )
+        # Grid thumbnails use the API's lightweight thumb URL;
+        # the full asset is fetched once, on selection
+        urls = [g.get("thumb") or g["url"] for g in vertical]
 
-        self.after(150, finish)
+        def on_result(i, thumb):
+            self.post_thumb(
+                search_id,
+                lambda: self.add_steam_thumb(vertical[i], thumb, i)
+            )
 
-    def add_steam_thumb_from_data(self, grid, data):
-        if self.placeholder_label.winfo_exists():
-            self.placeholder_label.grid_forget()
+        fetch_thumbs(
+            urls,
+            (THUMB_W, THUMB_H),
+            on_result,
+            cancelled=lambda: search_id != self.search_id,
+            per_host=load_download_workers()
+        )
+        if search_id != self.search_id:
+            return
 
-        # store for source persistence
-        self.source_state["steam"]["thumbs"].append((grid, data))
+        self.after(150, self.finish_thumb_load)
 
-        i = len(self.thumb_imgs)
+    def add_steam_thumb(self, grid, thumb, slot):
+        # Thumbnails arrive pre-scaled to THUMB_W x THUMB_H (same as TMDB)
+        self.add_thumb("steam", slot, grid, grid.get("thumb") or grid["url"], thumb)
 
-        img = Image.open(BytesIO(data)).convert("RGBA")
+    def apply_steam_poster(self, grid):
+        self.load_full_poster(grid["url"])
 
-        # Use vertical poster thumbnails (same as TMDB)
-        img = img.resize((THUMB_W, THUMB_H), Image.LANCZOS)
+    # -------- FULL POSTERS --------
 
-        tk_img = ImageTk.PhotoImage(img)
-        self.thumb_imgs.append(tk_img)
+    def load_full_poster(self, url, orientation=None):
+        # Full-resolution assets are only fetched when a thumbnail is
+        # picked; recently used ones are kept decoded in memory.
+        # The last click wins, whichever download finishes first.
+        self.poster_load_id += 1
+        load_id = self.poster_load_id
 
-        ttk.Button(
-            self.thumb_frame,
-            image=tk_img,
-            command=lambda g=grid: self.apply_steam_poster(g)
-        ).grid(
-            row=(i // THUMBS_PER_ROW) + 1,
-            column=i % THUMBS_PER_ROW,
-            padx=5,
-            pady=5
-        )
+        poster = self.full_posters.get(url)
+        if poster is not None:
+            self.full_posters.move_to_end(url)
+            self.set_full_poster(load_id, url, poster, orientation)
+            return
 
-    def apply_steam_poster(self, grid):
-        poster = Image.open(
-            BytesIO(requests.get(grid["url"]).content)
-        ).convert("RGBA")
+        self.show_status("Loading poster…")
+
+        threading.Thread(
+            target=self.fetch_full_poster_thread,
+            args=(load_id, url, orientation),
+            daemon=True
+        ).start()
+
+    def fetch_full_poster_thread(self, load_id, url, orientation):
+        try:
+            poster = load_image_from_url(url, timeout=30)
+        except Exception as e:
+            if load_id == self.poster_load_id:
+                self.after(
+                    0,
+                    lambda e=e: messagebox.showerror("Error", f"Failed to load poster:\n{e}")
+                )
+            return
+
+        self.after(0, lambda: self.set_full_poster(load_id, url, poster, orientation))
+
+    def set_full_poster(self, load_id, url, poster, orientation):
+        if url not in self.full_posters:
+            self.full_poster_bytes += thumb_nbytes(poster)
+        self.full_posters[url] = poster
+
+        # Superseded by a later pick; keep the download for next time,
+        # but first in line for eviction
+        if load_id != self.poster_load_id:
+            self.full_posters.move_to_end(url, last=False)
+            self.trim_full_posters()
+            return
+
+        self.full_posters.move_to_end(url)
+        self.trim_full_posters()
 
         self.selected_poster_image = poster
-        self.poster_orientation = "horizontal" if poster.width > poster.height else "vertical"
+        self.poster_orientation = orientation or (
+            "horizontal" if poster.width > poster.height else "vertical"
+        )
         self.update_crop_labels()
         self.render_with_current_template()
+        self.show_status("Poster loaded")
 
     # -------- TMDB THUMBS --------
 
@@ -1618,144 +1711,133 @@ class App(tk.Tk):
     def fetch_tmdb_thumb_thread(self, item, search_id):
         try:
             posters = tmdb_get_posters(item)
+            paths = [p["file_path"] for p in posters if p.get("file_path")]
 
-            for poster in posters:
-                if search_id != self.search_id:
-                    return
-
-                path = poster.get("file_path")
-                if not path:
-                    continue
-
-                url = TMDB_IMG_BASE + path
-                r = requests.get(url, timeout=10)
-                r.raise_for_status()
-
-                self.after(
-                    0,
-                    lambda d=r.content: self.add_tmdb_thumb_from_data(d)
+            def on_result(i, thumb):
+                self.post_thumb(
+                    search_id,
+                    lambda: self.add_tmdb_thumb(paths[i], thumb, i)
                 )
 
+            # Small sized variant for the grid; the original is only
+            # downloaded when the poster is applied
+            fetch_thumbs(
+                [TMDB_THUMB_BASE + p for p in paths],
+                (THUMB_W, THUMB_H),
+                on_result,
+                cancelled=lambda: search_id != self.search_id,
+                per_host=load_download_workers()
+            )
+            if search_id != self.search_id:
+                return
+
+        except OfflineError:
+            self.post_thumb(search_id, self.finish_offline_thumb_load)
+            return
         except Exception:
             pass
 
-        def finish():
-            if self.loading_label.winfo_exists():
-                self.loading_label.grid_forget()
-
-            if not self.thumb_imgs and self.placeholder_label.winfo_exists():
-                self.placeholder_label.grid(
-                    row=0,
-                    column=0,
-                    columnspan=THUMBS_PER_ROW,
-                    pady=30
-                )
-
-        self.after(150, finish)
+        self.after(150, self.finish_thumb_load)
 
-    def add_tmdb_thumb_from_data(self, data):
-        if self.placeholder_label.winfo_exists():
-            self.placeholder_label.grid_forget()
+    def add_tmdb_thumb(self, path, thumb, slot):
+        self.add_thumb("tmdb", slot, path, TMDB_THUMB_BASE + path, thumb)
 
-        # store for source persistence
-        self.source_state["tmdb"]["thumbs"].append(data)
+    def apply_tmdb_poster(self, path):
+        self.load_full_poster(TMDB_IMG_BASE + path, orientation="vertical")
 
-        i = len(self.thumb_imgs)
+    def on_thumb_scroll(self, first, last):
+        self.thumb_scrollbar.set(first, last)
+        self.refresh_thumb_grid()
 
-        img = Image.open(BytesIO(data)).convert("RGBA")
-        img = img.resize((THUMB_W, THUMB_H), Image.LANCZOS)
-        tk_img = ImageTk.PhotoImage(img)
-        self.thumb_imgs.append(tk_img)
+        # Also fires when the grid grows, so short pages keep loading
+        # until the viewport is filled
+        if float(last) >= ICON_PAGE_TRIGGER:
+            self.load_next_icon_page()
 
-        ttk.Button(
-            self.thumb_frame,
-            image=tk_img,
-            command=lambda d=data: self.apply_tmdb_poster(d)
-        ).grid(
-            row=(i // THUMBS_PER_ROW) + 1,
-            column=i % THUMBS_PER_ROW,
-            padx=5,
-            pady=5
-        )
-
-    def apply_tmdb_poster(self, data):
-        poster = Image.open(BytesIO(data)).convert("RGBA")
-        self.selected_poster_image = poster
-        self.poster_orientation = "vertical"
-        self.update_crop_labels()
-        self.render_with_current_template()
-
-    def fetch_system_icons_thread(self, query, search_id):
-        results = []
+    def fetch_system_icons_thread(self, query, icon_search_id):
+        roots = []
 
         # Search system logo pack
         if self.icon_pack_dir and os.path.isdir(self.icon_pack_dir):
-            results.extend(
-                search_system_icons(query, self.icon_pack_dir)
-            )
+            roots.append(self.icon_pack_dir)
 
         # Search cached web logos
         if self.search_cached_logos.get() and os.path.isdir(WEB_LOGO_DIR):
-            results.extend(
-                search_system_icons(query, WEB_LOGO_DIR)
-            )
-
-        for icon_path in results:
-            if search_id != self.search_id:
-                return
-
-            try:
-                with open(icon_path, "rb") as f:
-                    data = f.read()
-
-                self.after(
-                    0,
-                    lambda d=data, p=icon_path: self.add_system_icon_thumb(d, p)
-                )
-            except Exception:
-                pass
-
-        self.after(150, self.finish_thumb_load)
+            roots.append(WEB_LOGO_DIR)
+
+        # Ranked paths only; nothing is opened until its page is shown
+        results = search_system_icons(query, roots)
+        self.post_icon(icon_search_id, lambda: self.start_icon_results(results))
+
+    def start_icon_results(self, results):
+        self.icon_results = results
+        self.icon_results_next = 0
+        self.icon_page_pending = 0
+
+        if results:
+            self.load_next_icon_page()
+        elif self.source_var.get() == "system":
+            self.finish_thumb_load()
+
+    def load_next_icon_page(self):
+        if (
+                self.source_var.get() != "system" or
+                self.icon_page_pending or
+                self.icon_results_next >= len(self.icon_results)
+        ):
+            return
 
-    def add_system_icon_thumb(self, data, path):
-        if self.placeholder_label.winfo_exists():
-            self.placeholder_label.grid_forget()
+        start = self.icon_results_next
+        page = self.icon_results[start:start + ICON_PAGE_SIZE]
+        self.icon_results_next += len(page)
+        self.icon_page_pending = len(page)
 
-        # store for source persistence
-        self.source_state["system"]["thumbs"].append((data, path))
+        icon_search_id = self.icon_search_id
+        for i, path in enumerate(page, start):
+            self.icon_pool.submit(self.load_icon_page_item, icon_search_id, i, path)
 
-        i = len(self.thumb_imgs)
+    def load_icon_page_item(self, icon_search_id, slot, path):
+        # Runs on an icon worker: file read and decode stay off the Tk thread.
+        # A newer logo search resets icon_page_pending, so stale items are
+        # simply skipped.
+        if icon_search_id != self.icon_search_id:
+            return
+        try:
+            thumb = load_icon_thumb(path)
+        except Exception:
+            thumb = None
 
-        img = Image.open(BytesIO(data)).convert("RGBA")
+        self.post_icon(icon_search_id, lambda: self.finish_icon_page_item(slot, path, thumb))
 
-        # Square system icon thumbnails
-        img = fit_inside(img, ICON_THUMB_SIZE, ICON_THUMB_SIZE)
+    def finish_icon_page_item(self, slot, path, thumb):
+        if thumb is not None:
+            self.add_system_icon_thumb(thumb, path, slot)
 
-        tk_img = ImageTk.PhotoImage(img)
-        self.thumb_imgs.append(tk_img)
+        self.icon_page_pending -= 1
+        # Pages keep loading while another source is shown; its loading
+        # label is not ours to hide
+        if not self.icon_page_pending and self.source_var.get() == "system":
+            self.finish_thumb_load()
+            self.after_idle(lambda: self.on_thumb_scroll(*self.canvas.yview()))
 
-        ttk.Button(
-            self.thumb_frame,
-            image=tk_img,
-            command=lambda p=path: self.apply_system_icon(p)
-        ).grid(
-            row=(i // THUMBS_PER_ROW) + 1,
-            column=i % THUMBS_PER_ROW,
-            padx=5,
-            pady=5
-        )
+    def add_system_icon_thumb(self, thumb, path, slot):
+        self.add_thumb("system", slot, path, icon_thumb_key(path), thumb)
 
     def apply_system_icon(self, path):
-        self.logo_image = Image.open(path).convert("RGBA")
+        self.logo_image = open_image(path)
         self.logo_path = path
         self.set_logo_name_from_path(path)
         self.render_with_current_template()
 
+    def finish_offline_thumb_load(self):
+        self.finish_thumb_load()
+        self.show_status("Offline: no cached images for this search")
+
     def finish_thumb_load(self):
         if self.loading_label.winfo_exists():
             self.loading_label.grid_forget()
 
-        if not self.thumb_imgs and self.placeholder_label.winfo_exists():
+        if not self.source_state[self.source_var.get()]["thumbs"] and self.placeholder_label.winfo_exists():
             self.placeholder_label.grid(
                 row=0,
                 column=0,
@@ -1763,6 +1845,29 @@ class App(tk.Tk):
                 pady=30
             )
 
+        # Labels above the grid changed height
+        self.refresh_thumb_grid()
+        self.after(100, lambda: self.memory_snapshot(f"grid_{self.source_var.get()}"))
+
+    def memory_snapshot(self, label):
+        # Profiling mode: tracemalloc report plus the grid / state counters
+        # most likely to show a leak
+        if not profiling.is_enabled():
+            return
+
+        photos = sum(1 for o in gc.get_objects() if isinstance(o, ImageTk.PhotoImage))
+        thumbs = [item for st in self.source_state.values() for item in st["thumbs"]]
+
+        profiling.snapshot(label, {
+            "PhotoImage objects": photos,
+            "thumb cells (visible / free)": f"{len(self.thumb_cells)} / {len(self.free_thumb_cells)}",
+            "source_state thumbs (in memory / total)":
+                f"{sum(1 for t in thumbs if t['thumb'] is not None)} / {len(thumbs)}",
+            "source_state thumb bytes": self.state_thumb_bytes,
+            "full posters in memory": len(self.full_posters),
+            "full poster bytes": self.full_poster_bytes,
+        })
+
     # -------- OUTPUT --------
 
     def choose_output_dir(self):
@@ -1805,51 +1910,59 @@ class App(tk.Tk):
         )
 
     def save(self):
-        if not self.output_image or not self.output_dir:
+        if not self.output_dir or not self.get_output_image():
             return
 
-        name = sanitize_filename(self.current_game_title or "nfc_card")
-
-        parts = [name]
-        if self.logo_name:
-            parts.append(self.logo_name)
-
-        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = "_".join(parts) + f"_{ts}.png"
-
-        self.output_image.save(os.path.join(self.output_dir, filename))
-        self.show_status("Image saved")
+        filename = card_filename(self.current_game_title, self.logo_name)
+        self.write_output(os.path.join(self.output_dir, filename))
 
     def save_as(self):
-        if not self.output_image:
+        if not self.get_output_image():
             return
 
-        default_name = sanitize_filename(self.current_game_title or "nfc_card")
-
-        parts = [default_name]
-        if self.logo_name:
-            parts.append(self.logo_name)
-
-        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        default_name = "_".join(parts)
-
         file_path = filedialog.asksaveasfilename(
             defaultextension=".png",
-            initialfile=f"{default_name}_{ts}.png",
+            initialfile=card_filename(self.current_game_title, self.logo_name),
             filetypes=[("PNG Image", "*.png")]
         )
 
         if not file_path:
             return
 
+        self.write_output(file_path)
+
+    def write_output(self, path):
+        # PNG encoding runs on the background writer; output images are
+        # never modified after rendering, so the writer can use it as is
+        png_writer.submit(
+            self.output_image,
+            path,
+            load_png_preset(),
+            on_done=self.post_save_result
+        )
+        self.show_status("Saving…")
+
+    def post_save_result(self, path, error):
+        # Writer thread; the window may already be closed when the last
+        # queued card finishes at exit
         try:
-            self.output_image.save(file_path)
-            self.show_status("Image saved")
-        except Exception as e:
+            self.after(0, lambda: self.finish_save(path, error))
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def finish_save(self, path, error):
+        if error is not None:
             messagebox.showerror(
                 "Error",
-                f"Failed to save image:\n{e}"
+                f"Failed to save image:\n{error}"
             )
+            return
+
+        waiting = png_writer.pending()
+        if waiting:
+            self.show_status(f"Saved {os.path.basename(path)} ({waiting} more queued)")
+        else:
+            self.show_status(f"Image saved: {os.path.basename(path)}")
 
     def pick_game(self, games):
         d = tk.Toplevel(self)
@@ -1881,7 +1994,7 @@ class App(tk.Tk):
             filetypes=[("Images", "*.png *.jpg *.jpeg *.webp")]
         )
         if p:
-            self.logo_image = Image.open(p).convert("RGBA")
+            self.logo_image = open_image(p)
             self.logo_path = p
             self.set_logo_name_from_path(p)
             self.render_with_current_template()
@@ -1945,10 +2058,10 @@ class App(tk.Tk):
             return
 
         try:
-            img = load_image_from_url(url)
-            cached = maybe_cache_web_image(img, url, kind="logo")
-
-            self.logo_image = cached
+            self.logo_image = load_image_from_url(
+                url,
+                cache_kind="logo" if self.cache_web_logos.get() else None
+            )
             self.logo_path = None
 
             name = os.path.splitext(os.path.basename(url.split("?")[0]))[0]
@@ -1966,12 +2079,13 @@ class App(tk.Tk):
             return
 
         try:
-            img = load_image_from_url(url)
-
             # ONLY web images are cached (posters go to web-images/posters)
-            self.selected_poster_image = maybe_cache_web_image(
-                img, url, kind="poster"
+            img = load_image_from_url(
+                url,
+                cache_kind="poster" if self.cache_web_posters.get() else None
             )
+            self.poster_load_id += 1  # supersedes a pending full poster download
+            self.selected_poster_image = img
 
             self.poster_orientation = (
                 "horizontal" if img.width > img.height else "vertical"
@@ -1991,4 +2105,4 @@ class App(tk.Tk):
 # ---------------- RUN ----------------
 
 if __name__ == "__main__":
-    App().mainloop()
+    App(profile="--profile" in sys.argv[1:]).mainloop()
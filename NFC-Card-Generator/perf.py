@@ -0,0 +1,106 @@
+# Stage timing hooks shared by the renderer, the GUI and the tools.
+# Code wraps the stages worth measuring in `with stage("name"):` and every
+# finished stage is handed to the registered collectors as (name, seconds).
+# With no collector registered a stage costs one list check.
+#
+# enable() registers the built-in collector: the last ROLLING_WINDOW
+# timings of each stage are kept for percentiles (see snapshot()), and
+# every timing is appended to a size-rotated PERF_LOG_FILE.
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+PERF_LOG_FILE = "perf.log"
+PERF_LOG_MAX_BYTES = 1024 * 1024
+PERF_LOG_BACKUPS = 3
+ROLLING_WINDOW = 500  # timings kept per stage
+
+_collectors = []
+
+_samples = defaultdict(lambda: deque(maxlen=ROLLING_WINDOW))
+_samples_lock = threading.Lock()
+_log = None
+
+
+def add_collector(fn):
+    _collectors.append(fn)
+
+def remove_collector(fn):
+    try:
+        _collectors.remove(fn)
+    except ValueError:
+        pass
+
+@contextmanager
+def stage(name):
+    if not _collectors:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for fn in list(_collectors):
+            fn(name, elapsed)
+
+
+# ---------------- ROLLING STATS ----------------
+
+def _record(name, seconds):
+    with _samples_lock:
+        _samples[name].append(seconds)
+    if _log is not None:
+        _log.info("%s %.2f ms", name, seconds * 1000)
+
+def enable(log_file=PERF_LOG_FILE):
+    global _log
+
+    if log_file and _log is None:
+        handler = RotatingFileHandler(
+            log_file,
+            maxBytes=PERF_LOG_MAX_BYTES,
+            backupCount=PERF_LOG_BACKUPS,
+            encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+
+        log = logging.getLogger("nfc-card-generator.perf")
+        log.setLevel(logging.INFO)
+        log.propagate = False
+        log.addHandler(handler)
+        _log = log
+
+    if _record not in _collectors:
+        add_collector(_record)
+
+def percentile(sorted_values, q):
+    # Nearest-rank percentile of an already sorted list
+    i = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[i]
+
+def snapshot():
+    # {stage: {n, last, p50, p90, p99}} in milliseconds
+    with _samples_lock:
+        samples = {name: list(values) for name, values in _samples.items() if values}
+
+    stats = {}
+    for name, values in sorted(samples.items()):
+        ordered = sorted(values)
+        stats[name] = {
+            "n": len(values),
+            "last": values[-1] * 1000,
+            "p50": percentile(ordered, 50) * 1000,
+            "p90": percentile(ordered, 90) * 1000,
+            "p99": percentile(ordered, 99) * 1000,
+        }
+    return stats
+
+def reset():
+    with _samples_lock:
+        _samples.clear()
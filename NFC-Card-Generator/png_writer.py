@@ -0,0 +1,75 @@
+# PNG output shared by the GUI and batch mode. Files are written with
+# atomic_write, so a crash or a full disk never leaves a truncated card
+# behind. The GUI hands finished cards to a single background writer
+# thread instead of encoding on the Tk thread.
+
+import atexit
+import queue
+import threading
+
+from atomic_file import atomic_write
+from perf import stage
+
+# name -> Pillow PNG options, from fast / large to slow / small.
+# "balanced" matches Pillow's defaults.
+PNG_PRESETS = {
+    "fast": {"compress_level": 1},
+    "balanced": {"compress_level": 6},
+    "small": {"compress_level": 9},
+    "smallest": {"optimize": True},
+}
+DEFAULT_PNG_PRESET = "balanced"
+
+_queue = queue.Queue()
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def save_png(img, path, preset=DEFAULT_PNG_PRESET):
+    options = PNG_PRESETS.get(preset, PNG_PRESETS[DEFAULT_PNG_PRESET])
+
+    with atomic_write(path, "wb") as f:
+        with stage("png_encode"):
+            img.save(f, format="PNG", **options)
+    return path
+
+
+# ---------------- BACKGROUND WRITER ----------------
+
+def _writer():
+    while True:
+        img, path, preset, on_done = _queue.get()
+        try:
+            save_png(img, path, preset)
+            error = None
+        except Exception as e:
+            error = e
+        finally:
+            _queue.task_done()
+
+        if on_done:
+            on_done(path, error)
+
+def submit(img, path, preset=DEFAULT_PNG_PRESET, on_done=None):
+    # Queue img for writing; on_done(path, error) runs on the writer thread
+    # once the file is in place (error is None) or writing failed.
+    # Cards are written one at a time, in submission order.
+    global _thread
+
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_writer, name="png-writer", daemon=True)
+            _thread.start()
+
+    _queue.put((img, path, preset, on_done))
+
+def pending():
+    return _queue.unfinished_tasks
+
+def wait():
+    # Block until every queued card has been written
+    _queue.join()
+
+
+# Do not lose queued saves when the window is closed right after saving
+atexit.register(wait)
@@ -0,0 +1,115 @@
+# Opt-in profiling mode for interactive sessions and batch runs.
+#
+#   profile(label)    cProfile the enclosed block (one render) into
+#                     PROFILE_DIR/<time>_<n>_<label>.pstats
+#   snapshot(label)   write the top tracemalloc allocations, grouped by
+#                     line, to PROFILE_DIR/<time>_<n>_<label>.txt
+#
+# Both are no-ops until enable() is called. Open .pstats files with
+# `python -m pstats <file>` or snakeviz. tracemalloc sees Python objects
+# only; Pillow pixel buffers live outside the Python heap.
+
+import cProfile
+import itertools
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_DIR = "profiles"
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 30
+
+_enabled = False
+_counter = itertools.count(1)
+_lock = threading.Lock()
+
+
+def enable():
+    global _enabled
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def is_enabled():
+    return _enabled
+
+def _output_path(label, ext):
+    with _lock:
+        n = next(_counter)
+    label = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_") or "profile"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(PROFILE_DIR, f"{stamp}_{os.getpid()}_{n:05d}_{label}.{ext}")
+
+
+# ---------------- CPU ----------------
+
+@contextmanager
+def profile(label):
+    # cProfile hooks only the calling thread, so wrap the work itself
+    # (e.g. inside the render worker), not the code that schedules it
+    if not _enabled:
+        yield
+        return
+
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:
+        # Another profiler is already active on this thread
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        prof.disable()
+        try:
+            prof.dump_stats(_output_path(label, "pstats"))
+        except OSError as e:
+            print("Failed to write profile:", e)
+
+
+# ---------------- MEMORY ----------------
+
+def snapshot(label, extra=None):
+    # extra: {"description": value} lines added to the report header
+    if not _enabled or not tracemalloc.is_tracing():
+        return None
+
+    snap = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    stats = snap.statistics("lineno")
+    current, peak = tracemalloc.get_traced_memory()
+
+    lines = [
+        f"# {label}",
+        f"traced: {current / 1024:.1f} KB (peak {peak / 1024:.1f} KB)",
+    ]
+    for key, value in (extra or {}).items():
+        lines.append(f"{key}: {value}")
+    lines.append("")
+    lines.append(f"Top {TOP_ALLOCATIONS} allocations by line:")
+    for stat in stats[:TOP_ALLOCATIONS]:
+        lines.append(str(stat))
+
+    path = _output_path(label, "txt")
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    except OSError as e:
+        print("Failed to write memory snapshot:", e)
+        return None
+    return path
@@ -0,0 +1,582 @@
+# Headless card render engine shared by the GUI, batch scripts and workers.
+# Nothing in here may touch Tk.
+
+from PIL import Image, ImageDraw
+import os
+import re
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+import threading
+import weakref
+
+from atomic_file import atomic_write
+from perf import stage
+
+def resource_path(relative_path):
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        # Resolve next to this module so scripts work from any cwd
+        base_path = os.path.dirname(os.path.abspath(__file__))
+
+    return os.path.join(base_path, relative_path)
+
+def sanitize_filename(name):
+    name = re.sub(r'[<>:"/\\|?*]', "", name)
+    return re.sub(r"\s+", " ", name).strip()
+
+def card_filename(title, logo_name=None, ts=None):
+    parts = [sanitize_filename(title or "nfc_card")]
+    if logo_name:
+        parts.append(logo_name)
+
+    if ts is None:
+        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return "_".join(parts) + f"_{ts}.png"
+
+def open_image(src):
+    # Decode a file path or file object to RGBA
+    with stage("decode"):
+        return Image.open(src).convert("RGBA")
+
+def logo_name_from_path(path):
+    if not path:
+        return None
+    return sanitize_filename(os.path.splitext(os.path.basename(path))[0])
+
+# ---------------- TEMPLATES ----------------
+
+CLEAR_W = 609
+CLEAR_H = 840
+
+T3_MAX_HEIGHT = 840
+T3_OVERFLOW_PAD = 120
+
+T4_POSTER_W = 619
+T4_POSTER_H = 834
+T4_POSTER_Y = 80
+
+TEMPLATES = {
+    "Black with Pins": {
+        "image_path": "templates/template_1.png",
+        "center": {
+            "x": 10,
+            "y": 59,
+            "w": 597,
+            "h": 855
+        },
+        "footer": {
+            "height": 90,
+            "logo_height": 46,
+            "max_width": 300,
+            "logo_margin": 25
+        },
+        "mode": "framed"
+    },
+
+    "White with Pins": {
+        "image_path": "templates/template_2.png",
+        "center": {
+            "x": 14,
+            "y": 63,
+            "w": 591,
+            "h": 849
+        },
+        "footer": {
+            "height": 90,
+            "logo_height": 46,
+            "max_width": 300,
+            "logo_margin": 25
+        },
+        "mode": "framed"
+    },
+
+    "HuCard Style": {
+        "image_path": "templates/template_3.png",
+        "poster_y": 150,  # Perfect starting point
+        "header_logo": {
+            "height": 63,
+            "max_width": 250,
+            "top_margin": 62,
+            "left_margin": 24
+        },
+        "mode": "layered"
+    },
+
+    "Black": {
+        "image_path": "templates/template_4.png",
+        "header_logo": {
+            "max_height": 62,
+            "max_width": 300,
+            "top_margin": 10
+        },
+        "mode": "framed-top-logo"
+    },
+
+    "White": {
+        "image_path": "templates/template_5.png",
+        "header_logo": {
+            "max_height": 62,
+            "max_width": 300,
+            "top_margin": 10
+        },
+        "mode": "framed-top-logo"
+    },
+
+    "Poster Only": {
+        "image_path": "templates/template_6.png",
+        "size": {
+            "w": 619,
+            "h": 994
+        },
+        "corner_radius": 22,
+        "mode": "full-poster-rounded"
+    }
+}
+
+
+# Decoded template bitmaps are shared process-wide and must be treated as
+# read-only; callers copy() before drawing on them.
+
+@lru_cache(maxsize=None)
+def load_template_image(name):
+    return Image.open(resource_path(TEMPLATES[name]["image_path"])).convert("RGBA")
+
+@lru_cache(maxsize=16)
+def load_template_scaled(name, scale):
+    img = load_template_image(name)
+    if scale == 1.0:
+        return img
+    return img.resize(
+        (round(img.width * scale), round(img.height * scale)),
+        Image.LANCZOS
+    )
+
+# Template selector thumbnails are not resized at startup: the build writes
+# them to TEMPLATE_THUMB_DIR, and source runs cache them in
+# TEMPLATE_THUMB_CACHE_DIR after the first launch.
+
+TEMPLATE_THUMB_DIR = os.path.join("templates", "thumbs")
+TEMPLATE_THUMB_CACHE_DIR = "template-thumbs"
+
+def template_thumb_name(name, width):
+    stem = os.path.splitext(os.path.basename(TEMPLATES[name]["image_path"]))[0]
+    return f"{stem}_{width}.png"
+
+def make_template_thumb(name, width):
+    img = load_template_image(name)
+    return img.resize((width, int(width * img.height / img.width)), Image.LANCZOS)
+
+def _open_thumb(path):
+    img = Image.open(path)
+    img.load()
+    return img.convert("RGBA")
+
+@lru_cache(maxsize=None)
+def load_template_thumb(name, width):
+    filename = template_thumb_name(name, width)
+
+    try:
+        return _open_thumb(resource_path(os.path.join(TEMPLATE_THUMB_DIR, filename)))
+    except OSError:
+        pass
+
+    # The cached copy is only trusted while it is newer than its template
+    cached = os.path.join(TEMPLATE_THUMB_CACHE_DIR, filename)
+    try:
+        if os.path.getmtime(cached) >= os.path.getmtime(resource_path(TEMPLATES[name]["image_path"])):
+            return _open_thumb(cached)
+    except OSError:
+        pass
+
+    thumb = make_template_thumb(name, width)
+    try:
+        os.makedirs(TEMPLATE_THUMB_CACHE_DIR, exist_ok=True)
+        with atomic_write(cached, "wb") as f:
+            thumb.save(f, format="PNG")
+    except OSError as e:
+        print("Failed to cache template thumbnail:", e)
+    return thumb
+
+def write_template_thumbs(width):
+    # Build step: ship ready-made selector thumbnails with the templates
+    out_dir = resource_path(TEMPLATE_THUMB_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    for name in TEMPLATES:
+        make_template_thumb(name, width).save(
+            os.path.join(out_dir, template_thumb_name(name, width)),
+            optimize=True
+        )
+
+
+# ---------------- IMAGE HELPERS ----------------
+
+def fit_inside(img, max_w, max_h):
+    scale = min(max_w / img.width, max_h / img.height)
+    new_w = int(img.width * scale)
+    new_h = int(img.height * scale)
+
+    resized = img.resize((new_w, new_h), Image.LANCZOS)
+
+    canvas = Image.new("RGBA", (max_w, max_h), (0, 0, 0, 0))
+    x = (max_w - new_w) // 2
+    y = (max_h - new_h) // 2
+    canvas.paste(resized, (x, y), resized)
+
+    return canvas
+
+# Scaled "cover" versions of recent posters, keyed by (poster identity, w, h).
+# Crop-mode switches and manual slider ticks only crop from these, so the
+# LANCZOS pass over a large original runs once per poster and target size.
+# PIL images are unhashable, so entries hold a weakref to validate the id().
+
+COVER_CACHE_SIZE = 8
+
+_cover_cache = OrderedDict()
+_cover_lock = threading.Lock()
+
+def scale_to_cover(img, w, h):
+    key = (id(img), w, h)
+
+    with _cover_lock:
+        entry = _cover_cache.get(key)
+        if entry and entry[0]() is img:
+            _cover_cache.move_to_end(key)
+            return entry[1]
+
+    ratio = max(w / img.width, h / img.height)
+    with stage("cover_resize"):
+        r = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.LANCZOS)
+
+    with _cover_lock:
+        _cover_cache[key] = (weakref.ref(img), r)
+        _cover_cache.move_to_end(key)
+        while len(_cover_cache) > COVER_CACHE_SIZE:
+            _cover_cache.popitem(last=False)
+
+    return r
+
+def clear_cover_cache():
+    with _cover_lock:
+        _cover_cache.clear()
+
+def cover_image(img, w, h):
+    r = scale_to_cover(img, w, h)
+    x = (r.width - w) // 2
+    y = (r.height - h) // 2
+    return r.crop((x, y, x + w, y + h))
+
+def cover_image_top(img, w, h):
+    r = scale_to_cover(img, w, h)
+    x = (r.width - w) // 2
+    return r.crop((x, 0, x + w, h))
+
+def cover_image_bottom(img, w, h):
+    r = scale_to_cover(img, w, h)
+    x = (r.width - w) // 2
+    y = r.height - h
+    return r.crop((x, y, x + w, y + h))
+
+def cover_image_manual(img, w, h, offset):
+    r = scale_to_cover(img, w, h)
+
+    x = (r.width - w) // 2
+    max_y = r.height - h
+
+    # Map slider (0–1000) to actual vertical range (0–max_y)
+    if max_y > 0:
+        y = int((offset / 1000) * max_y)
+    else:
+        y = 0
+
+    return r.crop((x, y, x + w, y + h))
+
+
+def apply_rounded_corners(img, radius):
+    with stage("rounded_mask"):
+        mask = Image.new("L", img.size, 0)
+        draw = ImageDraw.Draw(mask)
+
+        draw.rounded_rectangle(
+            (0, 0, img.width, img.height),
+            radius=radius,
+            fill=255
+        )
+
+        out = Image.new("RGBA", img.size)
+        out.paste(img, (0, 0), mask)
+    return out
+
+def apply_rounded_mask(img, radius):
+    with stage("rounded_mask"):
+        mask = Image.new("L", img.size, 0)
+        draw = ImageDraw.Draw(mask)
+
+        draw.rounded_rectangle(
+            (2, 2, img.width - 2, img.height - 2),
+            radius=radius - 2,
+            fill=255
+        )
+
+        out = Image.new("RGBA", img.size, (0, 0, 0, 0))
+        out.paste(img, (0, 0), mask)
+    return out
+
+# --- HORIZONTAL HELPERS ---
+
+def cover_image_left(img, w, h):
+    r = scale_to_cover(img, w, h)
+    y = (r.height - h) // 2
+    return r.crop((0, y, w, y + h))
+
+def cover_image_right(img, w, h):
+    r = scale_to_cover(img, w, h)
+    y = (r.height - h) // 2
+    x = r.width - w
+    return r.crop((x, y, x + w, y + h))
+
+def cover_image_manual_x(img, w, h, offset):
+    r = scale_to_cover(img, w, h)
+    y = (r.height - h) // 2
+    max_x = r.width - w
+    x = max(0, min(max_x, int(offset)))
+    return r.crop((x, y, x + w, y + h))
+
+def fit_to_width(img, target_width):
+    scale = target_width / img.width
+    return img.resize((target_width, int(img.height * scale)), Image.LANCZOS)
+
+def force_vertical_overflow(img, min_height):
+    if img.height >= min_height:
+        return img
+    scale = min_height / img.height
+    return img.resize(
+        (int(img.width * scale), int(img.height * scale)),
+        Image.LANCZOS
+    )
+
+def apply_footer_logo(base, logo, cfg):
+    if isinstance(logo, str):
+        logo = open_image(logo)
+
+    f = cfg["footer"]
+
+    with stage("logo_resize"):
+        # Scale by height first
+        scale = f["logo_height"] / logo.height
+        new_w = int(logo.width * scale)
+        new_h = f["logo_height"]
+
+        logo = logo.resize((new_w, new_h), Image.LANCZOS)
+
+        # Enforce max width if defined
+        if "max_width" in f and logo.width > f["max_width"]:
+            scale = f["max_width"] / logo.width
+            logo = logo.resize(
+                (f["max_width"], int(logo.height * scale)),
+                Image.LANCZOS
+            )
+
+    y = base.height - f["height"] + (f["height"] - logo.height) // 2
+    with stage("composite"):
+        base.paste(logo, (f["logo_margin"], y), logo)
+
+
+def apply_header_logo(base, logo, cfg):
+    if isinstance(logo, str):
+        logo = open_image(logo)
+
+    h = cfg["header_logo"]
+
+    with stage("logo_resize"):
+        # --- Resize by height first ---
+        scale = h["height"] / logo.height
+        logo = logo.resize(
+            (int(logo.width * scale), h["height"]),
+            Image.LANCZOS
+        )
+
+        # --- Enforce max width if needed ---
+        if logo.width > h["max_width"]:
+            scale = h["max_width"] / logo.width
+            logo = logo.resize(
+                (h["max_width"], int(logo.height * scale)),
+                Image.LANCZOS
+            )
+
+    # --- LEFT aligned (fixed) ---
+    x = h["left_margin"]
+
+    # --- VERTICALLY CENTERED inside header height ---
+    header_h = h["height"]
+    y = h["top_margin"] + (header_h - logo.height) // 2
+
+    with stage("composite"):
+        base.paste(logo, (x, y), logo)
+
+def apply_top_center_logo(base, logo, cfg, scale=1.0):
+    if isinstance(logo, str):
+        logo = open_image(logo)
+
+    h = cfg["header_logo"]
+
+    with stage("logo_resize"):
+        # Logos smaller than the box keep their own size, so measure the
+        # logo at the render scale (cfg is already scaled) and resize once
+        w, lh = logo.width * scale, logo.height * scale
+
+        # Scale by height first
+        if lh > h["max_height"]:
+            w, lh = int(w * (h["max_height"] / lh)), h["max_height"]
+
+        # Apply max width if present
+        if "max_width" in h and w > h["max_width"]:
+            w, lh = h["max_width"], int(lh * (h["max_width"] / w))
+
+        size = (max(1, int(w)), max(1, int(lh)))
+        if size != logo.size:
+            logo = logo.resize(size, Image.LANCZOS)
+
+    # Horizontal center
+    x = (base.width - logo.width) // 2
+
+    # Vertical center INSIDE header band
+    header_height = h["max_height"]
+    y = h["top_margin"] + (header_height - logo.height) // 2
+
+    with stage("composite"):
+        base.paste(logo, (x, y), logo)
+
+# ---------------- RENDER ----------------
+
+def card_size(template):
+    cfg = TEMPLATES[template]
+    if cfg.get("mode") == "full-poster-rounded":
+        return cfg["size"]["w"], cfg["size"]["h"]
+    return load_template_image(template).size
+
+def scale_cfg(value, scale):
+    # Scale every pixel measurement of a template config
+    if isinstance(value, dict):
+        return {k: scale_cfg(v, scale) for k, v in value.items()}
+    if isinstance(value, int) and not isinstance(value, bool):
+        return max(1, round(value * scale))
+    return value
+
+def poster_orientation_of(img):
+    return "horizontal" if img.width > img.height else "vertical"
+
+def crop_poster(img, w, h, mode="center", offset=0, orientation=None, scale=1.0):
+    if orientation is None:
+        orientation = poster_orientation_of(img)
+
+    if orientation == "horizontal":
+        if mode == "top":
+            return cover_image_left(img, w, h)
+        if mode == "bottom":
+            return cover_image_right(img, w, h)
+        if mode == "manual":
+            # Pixel offset at card size; follow the crop box when scaled
+            return cover_image_manual_x(img, w, h, offset * scale)
+        return cover_image(img, w, h)
+    else:
+        if mode == "top":
+            return cover_image_top(img, w, h)
+        if mode == "bottom":
+            return cover_image_bottom(img, w, h)
+        if mode == "manual":
+            return cover_image_manual(img, w, h, offset)
+        return cover_image(img, w, h)
+
+def render_card(template, poster=None, logo=None, crop_mode="center",
+                crop_offset=0, orientation=None, scale=1.0):
+    # poster / logo may be PIL images or file paths. Orientation is detected
+    # from the poster when not given. Returns None for templates that
+    # cannot be drawn without a poster.
+    #
+    # scale < 1 composites directly at preview resolution: template, clear
+    # areas and logo boxes are all scaled instead of downscaling the result.
+    cfg = TEMPLATES[template]
+    if scale != 1.0:
+        cfg = scale_cfg(cfg, scale)
+
+    clear_w = round(CLEAR_W * scale)
+    t4_w = round(T4_POSTER_W * scale)
+    t4_h = round(T4_POSTER_H * scale)
+    t4_y = round(T4_POSTER_Y * scale)
+
+    if isinstance(poster, str):
+        poster = open_image(poster)
+
+    def crop(img, w, h):
+        return crop_poster(img, w, h, crop_mode, crop_offset, orientation, scale)
+
+    # Template 6 – full poster with rounded corners (no base template, no logo)
+    if cfg.get("mode") == "full-poster-rounded":
+        if not poster:
+            return None
+
+        w = cfg["size"]["w"]
+        h = cfg["size"]["h"]
+
+        out = crop(poster, w, h)
+        return apply_rounded_corners(out, cfg.get("corner_radius", 24))
+
+    template_img = load_template_scaled(template, scale)
+
+    # ---------------- TEMPLATE 3 ----------------
+    if cfg["mode"] == "layered":
+        base = Image.new("RGBA", template_img.size, (0, 0, 0, 0))
+
+        if poster:
+            # Visible poster area = from poster_y to bottom
+            visible_h = template_img.height - cfg["poster_y"]
+
+            # Crop poster EXACTLY to visible area
+            cropped = crop(poster, clear_w, visible_h)
+
+            # Center horizontally
+            x = (template_img.width - clear_w) // 2
+
+            with stage("composite"):
+                base.paste(cropped, (x, cfg["poster_y"]), cropped)
+
+        # Overlay template artwork
+        with stage("composite"):
+            base.paste(template_img, (0, 0), template_img)
+
+        # HARD ROUND FINAL IMAGE (prevents ALL bleed)
+        base = apply_rounded_mask(base, radius=max(3, round(22 * scale)))
+
+        if logo:
+            apply_header_logo(base, logo, cfg)
+
+    # ---------------- TEMPLATE 4 & 5 ----------------
+    elif cfg["mode"] == "framed-top-logo":
+        base = template_img.copy()
+
+        if poster:
+            cropped = crop(poster, t4_w, t4_h)
+            x = (base.width - t4_w) // 2
+            with stage("composite"):
+                base.paste(cropped, (x, t4_y), cropped)
+
+        if logo:
+            apply_top_center_logo(base, logo, cfg, scale)
+
+    # ---------------- TEMPLATE 1 & 2 ----------------
+    else:
+        base = template_img.copy()
+
+        if logo:
+            apply_footer_logo(base, logo, cfg)
+
+        if poster:
+            c = cfg["center"]
+            cropped = crop(poster, c["w"], c["h"])
+            with stage("composite"):
+                base.paste(cropped, (c["x"], c["y"]), cropped)
+
+    return base
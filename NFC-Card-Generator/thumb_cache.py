@@ -0,0 +1,106 @@
+# Persistent cache of pre-scaled grid thumbnails, keyed by source URL and
+# thumbnail size. Thumbnails are stored as small WebP files so revisiting a
+# title paints the grid from local files without downloading or decoding
+# the source images again.
+
+import hashlib
+import os
+import threading
+from io import BytesIO
+
+from PIL import Image
+
+from atomic_file import atomic_write
+from http_client import fetch_many
+from perf import stage
+
+THUMB_CACHE_DIR = "thumb-cache"
+THUMB_CACHE_MAX_FILES = 20000  # ~10 KB each
+THUMB_QUALITY = 85
+
+
+def thumb_path(url, size):
+    key = hashlib.sha1(f"{url}|{size[0]}x{size[1]}".encode("utf-8")).hexdigest()
+    return os.path.join(THUMB_CACHE_DIR, key[:2], key + ".webp")
+
+def make_thumb(data, size):
+    with stage("thumb_decode"):
+        img = Image.open(BytesIO(data)).convert("RGBA")
+    with stage("thumb_resize"):
+        return img.resize(size, Image.LANCZOS)
+
+def load_thumb(url, size):
+    path = thumb_path(url, size)
+    try:
+        img = Image.open(path)
+        img.load()
+    except (OSError, ValueError):
+        return None
+
+    # mtime doubles as last access for pruning
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return img
+
+def save_thumb(url, size, img):
+    # True once the thumbnail is on disk
+    path = thumb_path(url, size)
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_write(path, "wb") as f:
+            img.save(f, format="WEBP", quality=THUMB_QUALITY)
+    except OSError as e:
+        print("Failed to cache thumbnail:", e)
+        return False
+    return True
+
+def fetch_thumbs(urls, size, on_result, cancelled=lambda: False, per_host=None):
+    # Call on_result(index, thumbnail) for every url: cached thumbnails
+    # first, straight from disk, then the rest as their downloads complete.
+    missing = []
+
+    for i, url in enumerate(urls):
+        if cancelled():
+            return
+        thumb = load_thumb(url, size)
+        if thumb is not None:
+            on_result(i, thumb)
+        else:
+            missing.append(i)
+
+    def on_download(j, data):
+        i = missing[j]
+        thumb = make_thumb(data, size)
+        save_thumb(urls[i], size, thumb)
+        on_result(i, thumb)
+
+    fetch_many(
+        [urls[i] for i in missing],
+        on_download,
+        cancelled=cancelled,
+        per_host=per_host
+    )
+
+def prune():
+    # Drop the least recently used thumbnails beyond THUMB_CACHE_MAX_FILES
+    files = []
+    for base, _, names in os.walk(THUMB_CACHE_DIR):
+        for name in names:
+            path = os.path.join(base, name)
+            try:
+                files.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+
+    files.sort()
+    for _, path in files[:max(0, len(files) - THUMB_CACHE_MAX_FILES)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def prune_in_background():
+    threading.Thread(target=prune, daemon=True).start()
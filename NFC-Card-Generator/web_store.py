@@ -0,0 +1,381 @@
+# Content-addressed store for images loaded from URLs.
+#
+#   web-images/index.json                       url hash -> blob metadata,
+#                                               content hash -> blob
+#   web-images/<kind>s/<content hash>/<name>    original downloaded bytes
+#
+# Blobs are stored untouched (no re-encoding) and shared by every URL that
+# served the same bytes. The original file name is kept as the leaf so
+# cached logos stay searchable by name and keep a readable logo name.
+#
+# The store is capped at a disk budget. Access times are tracked in the
+# index (filesystem atime is unreliable) and the least recently used blobs
+# are evicted by a background compaction pass.
+#
+# Lookups only touch the in-memory index; access times and hit counters
+# are written on a short timer. Every write merges this process' changes
+# over the index on disk, so batch workers do not overwrite each other.
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+
+from PIL import Image
+
+from atomic_file import atomic_write
+from http_client import http_get
+from renderer import open_image
+
+WEB_IMAGE_DIR = "web-images"
+WEB_POSTER_DIR = os.path.join(WEB_IMAGE_DIR, "posters")
+WEB_LOGO_DIR = os.path.join(WEB_IMAGE_DIR, "logos")
+WEB_INDEX_FILE = os.path.join(WEB_IMAGE_DIR, "index.json")
+WEB_INDEX_LOCK = WEB_INDEX_FILE + ".lock"
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+DEFAULT_BUDGET_MB = 1024
+INDEX_WRITE_DELAY = 2  # seconds; access times changed within this window share a write
+INDEX_LOCK_STALE = 10  # seconds; an older lock file was left by a crashed process
+INDEX_LOCK_WAIT = 0.2  # seconds a write waits for the lock before retrying later
+
+_DELETED = object()
+STAT_KEYS = ("hits", "misses", "evictions")
+
+_index = None
+_index_lock = threading.RLock()
+_timer = None
+
+# Changes not yet written: key -> entry / blob, or _DELETED
+_dirty_urls = {}
+_dirty_blobs = {}
+_stats_delta = dict.fromkeys(STAT_KEYS, 0)
+_budget_bytes = DEFAULT_BUDGET_MB * 1024 * 1024
+_compacting = threading.Lock()
+
+
+# ---------------- INDEX ----------------
+
+def url_key(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+def _read_index():
+    try:
+        with open(WEB_INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    if not isinstance(index, dict):
+        index = {}
+
+    index.setdefault("urls", {})
+    index.setdefault("blobs", {})
+    index["blobs"] = {
+        k: b for k, b in index["blobs"].items() if isinstance(b, dict)
+    }
+    index.setdefault("stats", {})
+    for key in STAT_KEYS:
+        index["stats"].setdefault(key, 0)
+    return index
+
+def _load_index():
+    global _index
+    if _index is None:
+        _index = _read_index()
+    return _index
+
+def _set_url(key, entry):
+    # entry None removes the url
+    index = _load_index()
+    if entry is None:
+        index["urls"].pop(key, None)
+        _dirty_urls[key] = _DELETED
+    else:
+        index["urls"][key] = entry
+        _dirty_urls[key] = entry
+
+def _set_blob(key, blob):
+    # blob None removes the blob
+    index = _load_index()
+    if blob is None:
+        index["blobs"].pop(key, None)
+        _dirty_blobs[key] = _DELETED
+    else:
+        index["blobs"][key] = blob
+        _dirty_blobs[key] = blob
+
+def _count(stat, n=1):
+    _load_index()["stats"][stat] += n
+    _stats_delta[stat] += n
+
+def _merged_index():
+    # The index on disk with this process' unsaved changes applied
+    index = _read_index()
+
+    for key, entry in _dirty_urls.items():
+        if entry is _DELETED:
+            index["urls"].pop(key, None)
+        else:
+            index["urls"][key] = entry
+
+    for key, blob in _dirty_blobs.items():
+        if blob is _DELETED:
+            index["blobs"].pop(key, None)
+            continue
+        other = index["blobs"].get(key)
+        if other:
+            blob["last_access"] = max(blob.get("last_access", 0), other.get("last_access", 0))
+        index["blobs"][key] = blob
+
+    for key, n in _stats_delta.items():
+        index["stats"][key] += n
+
+    return index
+
+@contextmanager
+def _index_file_lock():
+    # Serializes read-merge-write of the index between processes. Gives up
+    # with TimeoutError after INDEX_LOCK_WAIT: writes can come from the Tk
+    # thread and must not wait out a lock left by a crashed process.
+    deadline = time.monotonic() + INDEX_LOCK_WAIT
+    while True:
+        try:
+            fd = os.open(WEB_INDEX_LOCK, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(WEB_INDEX_LOCK) > INDEX_LOCK_STALE:
+                    os.remove(WEB_INDEX_LOCK)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{WEB_INDEX_LOCK} is held by another process")
+            time.sleep(0.01)
+
+    try:
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(WEB_INDEX_LOCK)
+        except OSError:
+            pass
+
+def _schedule_save():
+    global _timer
+    if _timer is None:
+        _timer = threading.Timer(INDEX_WRITE_DELAY, flush)
+        _timer.daemon = True
+        _timer.start()
+
+def flush():
+    global _index, _timer
+
+    with _index_lock:
+        _timer = None
+        if not (_dirty_urls or _dirty_blobs or any(_stats_delta.values())):
+            return
+
+        try:
+            os.makedirs(WEB_IMAGE_DIR, exist_ok=True)
+            with _index_file_lock():
+                index = _merged_index()
+                with atomic_write(WEB_INDEX_FILE) as f:
+                    json.dump(index, f, indent=1)
+        except TimeoutError:
+            # Changes stay in memory and are merged on the next attempt
+            _schedule_save()
+            return
+        except OSError as e:
+            print("Failed to save web image index:", e)
+            return
+
+        _index = index
+        _dirty_urls.clear()
+        _dirty_blobs.clear()
+        _stats_delta.update(dict.fromkeys(STAT_KEYS, 0))
+
+
+# ---------------- STORE ----------------
+
+def lookup(url):
+    # Path of the stored blob for url, or None
+    with _index_lock:
+        index = _load_index()
+        entry = index["urls"].get(url_key(url))
+        blob_key = entry and f"{entry['kind']}:{entry['sha256']}"
+        blob = entry and index["blobs"].get(blob_key)
+        path = blob and os.path.join(WEB_IMAGE_DIR, blob["path"])
+
+        if not path or not os.path.exists(path):
+            # Counted in memory; a plain miss writes nothing
+            _count("misses")
+            if entry:
+                _set_url(url_key(url), None)
+                _schedule_save()
+            return None
+
+        blob["last_access"] = time.time()
+        _set_blob(blob_key, blob)
+        _count("hits")
+        _schedule_save()
+        return path
+
+def blob_name(url, data):
+    name = os.path.basename(url.split("?")[0]) or "image"
+    stem, ext = os.path.splitext(name)
+    if ext.lower() not in IMAGE_EXTS:
+        # Name the blob after the real format so image tools accept it
+        try:
+            ext = "." + Image.open(BytesIO(data)).format.lower()
+        except Exception:
+            ext = ".img"
+    return stem + ext
+
+def put(url, data, kind="poster"):
+    content_hash = hashlib.sha256(data).hexdigest()
+    base_dir = WEB_LOGO_DIR if kind == "logo" else WEB_POSTER_DIR
+
+    with _index_lock:
+        index = _load_index()
+
+        # Reuse an existing blob with the same content
+        blob_key = f"{kind}:{content_hash}"
+        blob = index["blobs"].get(blob_key)
+        if blob and not os.path.exists(os.path.join(WEB_IMAGE_DIR, blob["path"])):
+            blob = None
+
+        if blob is None:
+            blob_dir = os.path.join(base_dir, content_hash[:16])
+            os.makedirs(blob_dir, exist_ok=True)
+            path = os.path.join(blob_dir, blob_name(url, data))
+            with atomic_write(path, "wb") as f:
+                f.write(data)
+            blob = {
+                "path": os.path.relpath(path, WEB_IMAGE_DIR),
+                "size": len(data),
+            }
+
+        blob["last_access"] = time.time()
+        _set_blob(blob_key, blob)
+        _set_url(url_key(url), {
+            "url": url,
+            "sha256": content_hash,
+            "kind": kind,
+            "stored_at": time.time(),
+        })
+        # New blobs are recorded right away so they are never orphaned
+        flush()
+        over_budget = total_bytes() > _budget_bytes
+
+    if over_budget:
+        compact_in_background()
+
+    return os.path.join(WEB_IMAGE_DIR, blob["path"])
+
+
+# ---------------- EVICTION ----------------
+
+def set_budget_mb(mb):
+    global _budget_bytes
+    _budget_bytes = max(1, int(mb)) * 1024 * 1024
+
+def total_bytes():
+    with _index_lock:
+        return sum(b["size"] for b in _load_index()["blobs"].values())
+
+def stats():
+    with _index_lock:
+        index = _load_index()
+        return dict(
+            index["stats"],
+            blobs=len(index["blobs"]),
+            bytes=total_bytes(),
+            budget=_budget_bytes,
+        )
+
+def _remove_blob(path):
+    full = os.path.join(WEB_IMAGE_DIR, path)
+    try:
+        os.remove(full)
+        os.rmdir(os.path.dirname(full))
+    except OSError:
+        pass
+
+def compact():
+    # Evict least recently used blobs until the store fits the budget, and
+    # drop index entries whose blob has disappeared from disk.
+    if not _compacting.acquire(blocking=False):
+        return 0
+
+    global _index
+
+    try:
+        with _index_lock:
+            # Work on the latest index, including other processes' blobs
+            _index = index = _merged_index()
+            blobs = index["blobs"]
+
+            for key, blob in list(blobs.items()):
+                if not os.path.exists(os.path.join(WEB_IMAGE_DIR, blob["path"])):
+                    _set_blob(key, None)
+
+            evicted = []
+            total = sum(b["size"] for b in blobs.values())
+            for key, blob in sorted(blobs.items(), key=lambda kv: kv[1].get("last_access", 0)):
+                if total <= _budget_bytes:
+                    break
+                total -= blob["size"]
+                _set_blob(key, None)
+                evicted.append(blob["path"])
+
+            for key, e in list(index["urls"].items()):
+                if f"{e['kind']}:{e['sha256']}" not in blobs:
+                    _set_url(key, None)
+            _count("evictions", len(evicted))
+            flush()
+
+        # Delete files outside the index lock; lookups no longer see them
+        for path in evicted:
+            _remove_blob(path)
+
+        return len(evicted)
+    finally:
+        _compacting.release()
+
+def compact_in_background():
+    threading.Thread(target=compact, daemon=True).start()
+
+
+atexit.register(flush)
+
+
+# ---------------- LOADING ----------------
+
+def load_image_from_url(url, timeout=10, cache_kind=None):
+    # Serve from the store when possible; otherwise download, and keep the
+    # original bytes when cache_kind ("poster" / "logo") is given.
+    if not url.lower().startswith(("http://", "https://")):
+        raise ValueError("Only http(s) URLs are supported")
+
+    path = lookup(url)
+    if path:
+        return open_image(path)
+
+    data = http_get(url, timeout=timeout).content
+    img = open_image(BytesIO(data))
+
+    if cache_kind:
+        try:
+            path = put(url, data, cache_kind)
+            print(f"Cached web image → {path}")
+        except Exception as e:
+            print("Failed to cache web image:", e)
+
+    return img